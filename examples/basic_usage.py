@@ -7,14 +7,19 @@ Google Street View Hunter - Консольный интерфейс
 import sys
 import os
 import math
-import json
+from collections import namedtuple
 from datetime import datetime
 
 # Добавляем родительскую директорию в путь для импорта
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from streetview_hunter.core import StreetViewHunter
+    from streetview_hunter.core import StreetViewHunter, enable_console_logging
+    from streetview_hunter.cache import MetadataCache
+    from streetview_hunter.utils import (
+        json_loads, json_dumps, calculate_area_size, estimate_points_count,
+        is_valid_key
+    )
 except ImportError:
     print("❌ Ошибка: Модуль streetview_hunter не найден.")
     print("Решение 1: Установите пакет: pip install -e .")
@@ -22,23 +27,54 @@ except ImportError:
     sys.exit(1)
 
 
+_SEP = "=" * 60
+_NL_SEP = "\n" + _SEP
+
+# Предустановки быстрого поиска (создаются один раз при импорте)
+Preset = namedtuple('Preset', 'name step_km radius points delay')
+
+PRESETS = (
+    Preset('Малый город', 0.08, 40, 500, 0.04),
+    Preset('Средний город', 0.12, 60, 1000, 0.03),
+    Preset('Большой город', 0.18, 80, 1500, 0.03),
+    Preset('Мегаполис', 0.25, 100, 2000, 0.02),
+)
+PRESET_CHOICES = tuple(str(i) for i in range(1, len(PRESETS) + 1))
+
+
+def _prompt_float(message, default):
+    """Запрашивает число; пустой ввод возвращает default без преобразований."""
+    value = input(message).strip()
+    return float(value) if value else default
+
+
+def _prompt_int(message, default):
+    """Запрашивает целое число; пустой ввод возвращает default."""
+    value = input(message).strip()
+    return int(value) if value else default
+
+
 class StreetViewHunterConsole:
     """Консольный интерфейс для StreetViewHunter."""
     
     def __init__(self):
         self.api_key = None
         self.hunter = None
+        self.cache = None
         self.config = {}
         
+        # Включает обработку ANSI-последовательностей в консоли Windows
+        if os.name == 'nt':
+            os.system('')
+        
     def clear_screen(self):
-        """Очищает экран консоли."""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        """Очищает экран консоли ANSI-последовательностью (без запуска процесса)."""
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
     
     def print_header(self, title):
         """Печатает заголовок."""
-        print("\n" + "="*60)
-        print(f" {title}")
-        print("="*60)
+        print(f"{_NL_SEP}\n {title}\n{_SEP}")
     
     def get_api_key(self):
         """Запрашивает и проверяет API ключ."""
@@ -59,8 +95,8 @@ class StreetViewHunterConsole:
                 continue
             
             # Проверяем базовый формат ключа
-            if len(api_key) < 20:
-                print("⚠️  Ключ слишком короткий. Возможно, он неверный.")
+            if not is_valid_key(api_key):
+                print("⚠️  Ключ не похож на ключ Google API. Возможно, он неверный.")
                 choice = input("Продолжить с этим ключом? (y/n): ").lower()
                 if choice != 'y':
                     continue
@@ -68,7 +104,6 @@ class StreetViewHunterConsole:
             # Тестируем ключ
             if self.test_api_key(api_key):
                 self.api_key = api_key
-                self.hunter = StreetViewHunter(api_key)
                 print("✅ API ключ сохранен!")
                 return True
             else:
@@ -78,8 +113,9 @@ class StreetViewHunterConsole:
                     return False
     
     def test_api_key(self, api_key):
-        """Тестирует API ключ."""
+        """Тестирует API ключ (тестовые точки проверяются параллельно)."""
         import requests
+        from concurrent.futures import ThreadPoolExecutor, as_completed
         
         print("\n🔍 Тестирую API ключ...")
         
@@ -90,17 +126,34 @@ class StreetViewHunterConsole:
             ("48.8566,2.3522", "Париж"),
         ]
         
-        for location, name in test_locations:
-            url = "https://maps.googleapis.com/maps/api/streetview/metadata"
+        url = "https://maps.googleapis.com/maps/api/streetview/metadata"
+        session = requests.Session()
+        
+        def probe(location):
             params = {
                 "location": location,
                 "radius": 100,
                 "key": api_key
             }
+            response = session.get(url, params=params, timeout=5)
+            return json_loads(response.content)
+        
+        # Все запросы независимы: отправляем их одновременно через одну
+        # сессию и выходим, как только хотя бы один вернул "OK"
+        executor = ThreadPoolExecutor(max_workers=len(test_locations))
+        futures = {}
+        try:
+            futures = {
+                executor.submit(probe, location): name
+                for location, name in test_locations
+            }
             
-            try:
-                response = requests.get(url, params=params, timeout=5)
-                data = response.json()
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    data = future.result()
+                except Exception:
+                    continue
                 
                 if data.get("status") == "OK":
                     print(f"  ✅ {name}: найдены панорамы")
@@ -110,9 +163,13 @@ class StreetViewHunterConsole:
                     # API работает, просто нет панорам в этом месте
                 else:
                     print(f"  ❌ {name}: {data.get('status')}")
-            
-            except Exception:
-                continue
+        finally:
+            # Ещё не начатые проверки отменяются, а начатые (не дольше
+            # таймаута запроса) дожидаются, прежде чем закрыть их сессию
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            session.close()
         
         # Если ни один тест не прошел
         print("⚠️  Не удалось подтвердить работу API. Проверьте ключ вручную.")
@@ -128,10 +185,10 @@ class StreetViewHunterConsole:
         
         # Получаем координаты
         try:
-            lat_min = float(input("Минимальная широта (юг): ") or "55.75")
-            lat_max = float(input("Максимальная широта (север): ") or "55.78")
-            lon_min = float(input("Минимальная долгота (запад): ") or "37.60")
-            lon_max = float(input("Максимальная долгота (восток): ") or "37.65")
+            lat_min = _prompt_float("Минимальная широта (юг): ", 55.75)
+            lat_max = _prompt_float("Максимальная широта (север): ", 55.78)
+            lon_min = _prompt_float("Минимальная долгота (запад): ", 37.60)
+            lon_max = _prompt_float("Максимальная долгота (восток): ", 37.65)
         except ValueError:
             print("❌ Неверный формат координат. Использую значения по умолчанию.")
             lat_min, lat_max, lon_min, lon_max = 55.75, 55.78, 37.60, 37.65
@@ -175,19 +232,13 @@ class StreetViewHunterConsole:
         print("\n⚙️  Настройте параметры поиска:")
         print("   (нажмите Enter для использования рекомендаций)")
         
-        step_km = input(f"Шаг сетки в км [{rec_step}]: ").strip()
-        step_km = float(step_km) if step_km else rec_step
-        
-        search_radius = input(f"Радиус поиска в метрах [{rec_radius}]: ").strip()
-        search_radius = int(search_radius) if search_radius else rec_radius
-        
-        max_points = input(f"Макс. точек для проверки [{rec_points}]: ").strip()
-        max_points = int(max_points) if max_points else rec_points
+        step_km = _prompt_float(f"Шаг сетки в км [{rec_step}]: ", rec_step)
+        search_radius = _prompt_int(f"Радиус поиска в метрах [{rec_radius}]: ", rec_radius)
+        max_points = _prompt_int(f"Макс. точек для проверки [{rec_points}]: ", rec_points)
         
         # Дополнительные параметры
         print("\n📊 Дополнительные настройки:")
-        delay = input("Задержка между запросами (сек) [0.03]: ").strip()
-        delay = float(delay) if delay else 0.03
+        delay = _prompt_float("Задержка между запросами (сек) [0.03]: ", 0.03)
         
         city_name = input("Название города (для имени файла): ").strip()
         if not city_name:
@@ -227,14 +278,7 @@ class StreetViewHunterConsole:
     
     def calculate_area_size(self, lat_min, lat_max, lon_min, lon_max):
         """Рассчитывает размер области в километрах."""
-        avg_lat = (lat_min + lat_max) / 2
-        km_per_degree_lat = 111.0
-        km_per_degree_lon = 111.0 * math.cos(math.radians(avg_lat))
-        
-        width_km = (lon_max - lon_min) * km_per_degree_lon
-        height_km = (lat_max - lat_min) * km_per_degree_lat
-        
-        return width_km, height_km
+        return calculate_area_size(lat_min, lat_max, lon_min, lon_max)
     
     def show_config_summary(self):
         """Показывает сводку конфигурации."""
@@ -245,19 +289,6 @@ class StreetViewHunterConsole:
         area = self.config['area_info']
         output = self.config['output']
         
-        print(f"\n📍 Область поиска:")
-        print(f"   Широта:  {bounds['lat_min']:.5f} → {bounds['lat_max']:.5f}")
-        print(f"   Долгота: {bounds['lon_min']:.5f} → {bounds['lon_max']:.5f}")
-        print(f"   Размер:  {area['width_km']:.1f} × {area['height_km']:.1f} км")
-        print(f"   Площадь: {area['area_km2']:.1f} кв. км")
-        print(f"   Тип:     {area['city_type']}")
-        
-        print(f"\n⚙️  Параметры поиска:")
-        print(f"   Шаг сетки:     {params['step_km']} км (~{params['step_km']*1000:.0f} м)")
-        print(f"   Радиус поиска: {params['search_radius']} м")
-        print(f"   Макс. точек:   {params['max_points']}")
-        print(f"   Задержка:      {params['delay']} сек")
-        
         # Оцениваем количество точек
         points_count = self.estimate_points_count(
             bounds['lat_min'], bounds['lat_max'],
@@ -266,25 +297,37 @@ class StreetViewHunterConsole:
         )
         actual_points = min(points_count, params['max_points'])
         
-        print(f"\n📊 Прогноз:")
-        print(f"   Всего точек в сетке:   {points_count}")
-        print(f"   Будет проверено:       {actual_points}")
-        print(f"   Ориентировочное время: {actual_points * params['delay'] / 60:.1f} мин")
-        
-        print(f"\n💾 Выходные данные:")
-        print(f"   Город:          {output['city_name']}")
-        print(f"   Файл:           {output['filename']}")
+        # Сводка выводится одной записью в stdout
+        lines = [
+            "\n📍 Область поиска:",
+            f"   Широта:  {bounds['lat_min']:.5f} → {bounds['lat_max']:.5f}",
+            f"   Долгота: {bounds['lon_min']:.5f} → {bounds['lon_max']:.5f}",
+            f"   Размер:  {area['width_km']:.1f} × {area['height_km']:.1f} км",
+            f"   Площадь: {area['area_km2']:.1f} кв. км",
+            f"   Тип:     {area['city_type']}",
+            
+            "\n⚙️  Параметры поиска:",
+            f"   Шаг сетки:     {params['step_km']} км (~{params['step_km']*1000:.0f} м)",
+            f"   Радиус поиска: {params['search_radius']} м",
+            f"   Макс. точек:   {params['max_points']}",
+            f"   Задержка:      {params['delay']} сек",
+            
+            "\n📊 Прогноз:",
+            f"   Всего точек в сетке:   {points_count}",
+            f"   Будет проверено:       {actual_points}",
+            f"   Ориентировочное время: {actual_points * params['delay'] / 60:.1f} мин",
+            
+            "\n💾 Выходные данные:",
+            f"   Город:          {output['city_name']}",
+            f"   Файл:           {output['filename']}",
+        ]
+        print("\n".join(lines))
         
         return True
     
     def estimate_points_count(self, lat_min, lat_max, lon_min, lon_max, step_km):
         """Оценивает количество точек в сетке."""
-        width_km, height_km = self.calculate_area_size(lat_min, lat_max, lon_min, lon_max)
-        
-        points_x = int(width_km / step_km) + 1
-        points_y = int(height_km / step_km) + 1
-        
-        return points_x * points_y
+        return estimate_points_count(lat_min, lat_max, lon_min, lon_max, step_km)
     
     def start_search(self):
         """Запускает поиск панорам."""
@@ -303,18 +346,26 @@ class StreetViewHunterConsole:
         print("-"*60)
         
         try:
-            # Запускаем поиск
-            stats = self.hunter.search_area(
-                lat_min=bounds['lat_min'],
-                lat_max=bounds['lat_max'],
-                lon_min=bounds['lon_min'],
-                lon_max=bounds['lon_max'],
-                step_km=params['step_km'],
-                search_radius=params['search_radius'],
-                max_points=params['max_points'],
-                output_file=output['filename'],
-                delay=params['delay']
-            )
+            # Кэш ответов API переживает повторные запуски: при подборе
+            # параметров уже проверенные точки не тратят запросы
+            if self.cache is None:
+                self.cache = MetadataCache()
+            
+            # Одна сессия с пулом соединений на весь запуск:
+            # все точки сетки проверяются через keep-alive соединения
+            with StreetViewHunter(self.api_key, cache=self.cache) as hunter:
+                self.hunter = hunter
+                stats = hunter.search_area(
+                    lat_min=bounds['lat_min'],
+                    lat_max=bounds['lat_max'],
+                    lon_min=bounds['lon_min'],
+                    lon_max=bounds['lon_max'],
+                    step_km=params['step_km'],
+                    search_radius=params['search_radius'],
+                    max_points=params['max_points'],
+                    output_file=output['filename'],
+                    delay=params['delay']
+                )
             
             # Сохраняем конфигурацию
             self.save_config_to_file(stats)
@@ -350,8 +401,8 @@ class StreetViewHunterConsole:
         }
         
         try:
-            with open(config_file, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, indent=2, ensure_ascii=False)
+            with open(config_file, 'wb') as f:
+                f.write(json_dumps(save_data))
             
             print(f"\n💾 Конфигурация сохранена в: {config_file}")
             
@@ -362,61 +413,31 @@ class StreetViewHunterConsole:
         """Меню быстрого поиска с предустановками."""
         self.print_header("БЫСТРЫЙ ПОИСК")
         
-        presets = {
-            '1': {
-                'name': 'Малый город',
-                'step_km': 0.08,
-                'radius': 40,
-                'points': 500,
-                'delay': 0.04,
-            },
-            '2': {
-                'name': 'Средний город',
-                'step_km': 0.12,
-                'radius': 60,
-                'points': 1000,
-                'delay': 0.03,
-            },
-            '3': {
-                'name': 'Большой город',
-                'step_km': 0.18,
-                'radius': 80,
-                'points': 1500,
-                'delay': 0.03,
-            },
-            '4': {
-                'name': 'Мегаполис',
-                'step_km': 0.25,
-                'radius': 100,
-                'points': 2000,
-                'delay': 0.02,
-            },
-        }
-        
-        print("\n🎯 Выберите тип города:")
-        for key, preset in presets.items():
-            print(f"  {key}. {preset['name']}")
-            print(f"     • Шаг: {preset['step_km']} км")
-            print(f"     • Радиус: {preset['radius']} м")
-            print(f"     • Точки: {preset['points']}")
-            print()
+        lines = ["\n🎯 Выберите тип города:"]
+        for key, preset in enumerate(PRESETS, 1):
+            lines.append(f"  {key}. {preset.name}")
+            lines.append(f"     • Шаг: {preset.step_km} км")
+            lines.append(f"     • Радиус: {preset.radius} м")
+            lines.append(f"     • Точки: {preset.points}")
+            lines.append("")
+        print("\n".join(lines))
         
         choice = input("Ваш выбор (1-4): ").strip()
         
-        if choice in presets:
-            preset = presets[choice]
+        if choice in PRESET_CHOICES:
+            preset = PRESETS[int(choice) - 1]
             
-            print(f"\n🏙️  Выбран тип: {preset['name']}")
+            print(f"\n🏙️  Выбран тип: {preset.name}")
             
             # Запрашиваем только координаты и название
             city_name = input("Название города: ").strip()
             if not city_name:
-                city_name = preset['name'].replace(' ', '_').lower()
+                city_name = preset.name.replace(' ', '_').lower()
             
             print("\n📍 Введите координаты центра города:")
             try:
-                center_lat = float(input("  Широта центра: ") or "55.75")
-                center_lon = float(input("  Долгота центра: ") or "37.62")
+                center_lat = _prompt_float("  Широта центра: ", 55.75)
+                center_lon = _prompt_float("  Долгота центра: ", 37.62)
             except ValueError:
                 print("⚠️  Неверный формат. Использую Москву по умолчанию.")
                 center_lat, center_lon = 55.75, 37.62
@@ -424,19 +445,20 @@ class StreetViewHunterConsole:
             # Автоматически задаем область вокруг центра
             # Примерно 5x5 км для малого города, 10x10 для среднего и т.д.
             size_factor = 2.5 + (float(choice) * 2.5)  # 5, 7.5, 10, 12.5 км радиус
+            km_per_deg_lon = 111.0 * math.cos(math.radians(center_lat))
             
             self.config = {
                 'bounds': {
                     'lat_min': center_lat - (size_factor / 111.0),
                     'lat_max': center_lat + (size_factor / 111.0),
-                    'lon_min': center_lon - (size_factor / (111.0 * math.cos(math.radians(center_lat)))),
-                    'lon_max': center_lon + (size_factor / (111.0 * math.cos(math.radians(center_lat)))),
+                    'lon_min': center_lon - (size_factor / km_per_deg_lon),
+                    'lon_max': center_lon + (size_factor / km_per_deg_lon),
                 },
                 'search_params': {
-                    'step_km': preset['step_km'],
-                    'search_radius': preset['radius'],
-                    'max_points': preset['points'],
-                    'delay': preset['delay'],
+                    'step_km': preset.step_km,
+                    'search_radius': preset.radius,
+                    'max_points': preset.points,
+                    'delay': preset.delay,
                 },
                 'output': {
                     'filename': f"{city_name}_панорамы.txt",
@@ -456,7 +478,7 @@ class StreetViewHunterConsole:
                 'width_km': width_km,
                 'height_km': height_km,
                 'area_km2': width_km * height_km,
-                'city_type': preset['name'],
+                'city_type': preset.name,
             }
             
             return True
@@ -470,8 +492,7 @@ class StreetViewHunterConsole:
             self.clear_screen()
             self.print_header("GOOGLE STREET VIEW HUNTER")
             
-            print("\n🏠 ГЛАВНОЕ МЕНЮ")
-            print("="*60)
+            print(f"\n🏠 ГЛАВНОЕ МЕНЮ\n{_SEP}")
             
             # Показываем текущий статус
             if self.api_key:
@@ -554,6 +575,8 @@ class StreetViewHunterConsole:
                 input("\nНажмите Enter чтобы продолжить...")
             
             elif choice == "0":
+                if self.cache is not None:
+                    self.cache.close()
                 print("\n👋 До свидания! Спасибо за использование StreetViewHunter!")
                 break
             
@@ -565,31 +588,31 @@ class StreetViewHunterConsole:
         """Показывает справку."""
         self.print_header("ПОМОЩЬ И ДОКУМЕНТАЦИЯ")
         
-        print("\n📚 КАК ПОЛЬЗОВАТЬСЯ:")
-        print("1. 🔑 Получите API ключ на https://console.cloud.google.com/")
-        print("2. 📍 Укажите координаты области поиска")
-        print("3. ⚙️  Настройте параметры (или используйте быстрый поиск)")
-        print("4. 🚀 Запустите поиск")
-        print("5. 💾 Получите файлы со ссылками на панорамы")
-        
-        print("\n⚙️  РЕКОМЕНДАЦИИ ПО ПАРАМЕТРАМ:")
-        print("• Шаг сетки: 0.08-0.25 км (чем мельче шаг, тем больше точек)")
-        print("• Радиус поиска: 30-100 м (чем больше радиус, тем больше шансов найти панорамы)")
-        print("• Макс. точек: зависит от размера города")
-        print("• Задержка: 0.03-0.05 сек (чтобы не превысить лимиты API)")
-        
-        print("\n⚠️  ВАЖНО:")
-        print("• Бесплатный лимит Google: 28,000 запросов в месяц")
-        print("• Street View есть не во всех городах")
-        print("• Для коммерческого использования нужен платный тариф")
-        
-        print("\n📞 ПОДДЕРЖКА:")
-        print("• GitHub: https://github.com/IvanZasukhin/google-streetview-hunter")
-        print("• Email: ivanzasukhin11@gmail.com")
+        print(
+            "\n📚 КАК ПОЛЬЗОВАТЬСЯ:\n"
+            "1. 🔑 Получите API ключ на https://console.cloud.google.com/\n"
+            "2. 📍 Укажите координаты области поиска\n"
+            "3. ⚙️  Настройте параметры (или используйте быстрый поиск)\n"
+            "4. 🚀 Запустите поиск\n"
+            "5. 💾 Получите файлы со ссылками на панорамы\n"
+            "\n⚙️  РЕКОМЕНДАЦИИ ПО ПАРАМЕТРАМ:\n"
+            "• Шаг сетки: 0.08-0.25 км (чем мельче шаг, тем больше точек)\n"
+            "• Радиус поиска: 30-100 м (чем больше радиус, тем больше шансов найти панорамы)\n"
+            "• Макс. точек: зависит от размера города\n"
+            "• Задержка: 0.03-0.05 сек (чтобы не превысить лимиты API)\n"
+            "\n⚠️  ВАЖНО:\n"
+            "• Бесплатный лимит Google: 28,000 запросов в месяц\n"
+            "• Street View есть не во всех городах\n"
+            "• Для коммерческого использования нужен платный тариф\n"
+            "\n📞 ПОДДЕРЖКА:\n"
+            "• GitHub: https://github.com/IvanZasukhin/google-streetview-hunter\n"
+            "• Email: ivanzasukhin11@gmail.com"
+        )
 
 
 def main():
     """Основная функция."""
+    enable_console_logging()
     app = StreetViewHunterConsole()
     app.main_menu()
 
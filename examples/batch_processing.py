@@ -3,28 +3,267 @@
 Пример пакетной обработки для StreetViewHunter.
 """
 
+import argparse
+import queue
 import sys
 import os
 
 # Добавляем родительскую директорию в путь для импорта
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from streetview_hunter.core import StreetViewHunter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+import yaml
 
-def main():
-    """Простой пример пакетной обработки."""
+from streetview_hunter.core import StreetViewHunter, enable_console_logging
+from streetview_hunter.ratelimit import AdaptiveTokenBucket
+from streetview_hunter.utils import load_config, list_config_files, json_dumps, is_valid_key
+
+from city_profiles import CITY_PROFILES, parse_city_ids
+
+
+_SEP = "=" * 60
+_NL_SEP = "\n" + _SEP
+
+# Конфигурации городов в формате search_from_config, построенные из общих
+# профилей city_profiles.py (одно место для границ и параметров поиска)
+CITY_CONFIGS = {
+    city_id: {
+        "name": profile["name"],
+        "bounds": profile["bounds"],
+        "search_params": profile["search_params"],
+        "output": {"filename": f"{city_id}_панорамы.txt"}
+    }
+    for city_id, profile in CITY_PROFILES.items()
+}
+
+
+# С какого числа конфигураций их стоит разбирать в нескольких процессах:
+# запуск пула стоит ~0.1 с, что окупается только на больших папках
+PARALLEL_PARSE_MIN_FILES = 64
+
+
+def _try_load_config(path):
+    """
+    Разбирает один файл; ошибка возвращается, а не выбрасывается, чтобы
+    один битый файл не прерывал разбор остальных (в том числе в пуле
+    процессов, где исключение из map обрывает весь результат).
+
+    Returns:
+        Кортеж (конфигурация, None) или (None, текст ошибки)
+    """
+    try:
+        return load_config(path), None
+    except (KeyError, ValueError, TypeError, yaml.YAMLError) as e:
+        # Некорректный, пустой (None вместо словаря) или неполный файл
+        return None, str(e)
+
+
+def _load_configs(config_files):
+    """
+    Разбирает YAML-файлы, при большом их числе — параллельно в процессах.
+
+    Returns:
+        Список кортежей (конфигурация, ошибка) в порядке файлов, как у
+        _try_load_config
+    """
+    if len(config_files) < PARALLEL_PARSE_MIN_FILES:
+        return [_try_load_config(path) for path in config_files]
+    
+    # Разбор YAML упирается в CPU, поэтому процессы, а не потоки. Кэш
+    # load_config у каждого процесса свой и после его завершения теряется:
+    # родительский процесс уже разобранные файлы из него не получит, поэтому
+    # пул — только для больших папок, которые разбираются один раз
+    with ProcessPoolExecutor() as executor:
+        return list(executor.map(_try_load_config, config_files, chunksize=8))
+
+
+class BatchProcessor:
+    """Пакетный поиск панорам сразу в нескольких городах."""
     
-    print("🏙️  ПАКЕТНАЯ ОБРАБОТКА STREETVIEWHUNTER")
-    print("=" * 60)
+    def __init__(self, api_key, concurrency=8, rate_per_minute=1800, burst=50):
+        """
+        Args:
+            api_key: Google Cloud API ключ
+            concurrency: Максимум городов, обрабатываемых одновременно
+            rate_per_minute: Общий лимит запросов в минуту на все города
+            burst: Сколько запросов можно отправить залпом сверх средней
+                частоты (квота Google считается поминутно)
+        """
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.results = []
+        
+        # Одно ведро на все города: параллельные города делят одну квоту
+        # ключа, а отказ по лимиту в любом из них притормаживает все
+        # (частота снижается вдвое и затем постепенно восстанавливается)
+        self.rate_limiter = AdaptiveTokenBucket(
+            rate=rate_per_minute / 60, capacity=burst
+        )
+        
+        # По охотнику на поток: HTTP-сессии (и соединения keep-alive)
+        # переиспользуются от города к городу, а не открываются заново
+        self._hunter_pool = queue.Queue()
+        for _ in range(concurrency):
+            self._hunter_pool.put(
+                StreetViewHunter(self.api_key, rate_limiter=self.rate_limiter)
+            )
     
-    # Запрос API ключа
-    api_key = input("Введите ваш Google API ключ: ").strip()
+    def _process_one(self, city, config):
+        """Ищет панорамы в одном городе."""
+        print(f"{_NL_SEP}\n🔍 Обрабатываю: {city}\n{_SEP}")
+        
+        hunter = self._hunter_pool.get()
+        try:
+            hunter.reset()
+            stats = hunter.search_from_config(config)
+        finally:
+            self._hunter_pool.put(hunter)
+        
+        return {"city": city, "stats": stats}
     
-    if not api_key or api_key == "ВАШ_GOOGLE_API_КЛЮЧ":
-        print("⚠️  Необходимо указать действительный API ключ")
-        return
+    def process_city_list(self, city_configs):
+        """
+        Обрабатывает города параллельно.
+        
+        Каждый город — это десятки и сотни сетевых запросов, поэтому города
+        не ждут друг друга: одновременно идёт поиск не более чем в
+        concurrency городах.
+        
+        Args:
+            city_configs: Словарь {название города: конфигурация}
+            
+        Returns:
+            Список результатов {"city": ..., "stats": ...} в порядке городов
+        """
+        workers = max(1, min(self.concurrency, len(city_configs)))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda item: self._process_one(*item), city_configs.items()
+            ))
+        
+        self.results.extend(results)
+        return results
+    
+    def process_directory(self, config_dir):
+        """
+        Обрабатывает все YAML-конфигурации из папки.
+        
+        Args:
+            config_dir: Папка с конфигурациями (например, configs/)
+            
+        Returns:
+            Список результатов, как в process_city_list
+        """
+        config_files = list_config_files(config_dir)
+        city_configs = {}
+        
+        # Сначала разбираются все конфигурации, затем идут сетевые запросы
+        for config_path, (config, error) in zip(config_files, _load_configs(config_files)):
+            if error is not None:
+                print(f"⚠️  Пропускаю {config_path}: {error}")
+                continue
+            
+            file_name = os.path.basename(config_path)
+            city = config.get('name', file_name)
+            if city in city_configs:
+                # Одинаковое name в разных файлах: оба города обрабатываются,
+                # второй различается по имени файла
+                print(f"⚠️  Название «{city}» уже встречалось, {file_name} "
+                      f"обрабатывается как «{city} ({file_name})»")
+                city = f"{city} ({file_name})"
+            city_configs[city] = config
+        
+        return self.process_city_list(city_configs)
+    
+    def save_summary_report(self, output_path="batch_report.json"):
+        """
+        Сохраняет сводный отчёт по всем обработанным городам.
+        
+        Результаты городов сериализуются и записываются по одному, поэтому
+        в памяти не собирается копия всего отчёта.
+        
+        Args:
+            output_path: Путь к JSON-файлу отчёта
+        """
+        summary = {
+            "cities": len(self.results),
+            "total_panoramas": sum(
+                result["stats"].get('total', 0) for result in self.results
+            )
+        }
+        
+        with open(output_path, 'wb', buffering=1024 * 1024) as f:
+            f.write(b'{"batch_processing_summary": ')
+            f.write(json_dumps(summary))
+            f.write(b',\n"cities": [\n')
+            for i, result in enumerate(self.results):
+                if i:
+                    f.write(b',\n')
+                f.write(json_dumps(result))
+            f.write(b'\n]}\n')
+        
+        print(f"📄 Отчёт сохранён: {output_path}")
+    
+    def close(self):
+        """Закрывает HTTP-сессии всех охотников пула."""
+        while not self._hunter_pool.empty():
+            self._hunter_pool.get_nowait().close()
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def parse_arguments(argv=None):
+    """Парсинг аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        description="Пакетный поиск панорам в нескольких городах"
+    )
+    parser.add_argument("--api-key", help="Google Cloud API ключ")
+    parser.add_argument(
+        "--cities",
+        help=f"Города через запятую ({', '.join(CITY_CONFIGS)})"
+    )
+    parser.add_argument(
+        "--config-dir",
+        help="Папка с YAML-конфигурациями городов (например, configs/)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Максимум городов, обрабатываемых одновременно (по умолчанию: 8)"
+    )
+    parser.add_argument(
+        "--rate-per-minute",
+        type=int,
+        default=1800,
+        help="Общий лимит запросов в минуту (по умолчанию: 1800)"
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=50,
+        help="Запросов залпом сверх средней частоты (по умолчанию: 50)"
+    )
+    parser.add_argument(
+        "--report",
+        help="Сохранить сводный JSON-отчёт в указанный файл"
+    )
+    parser.add_argument(
+        "--interactive",
+        action="store_true",
+        help="Выбрать города в диалоге (режим по умолчанию без --cities/--config-dir)"
+    )
+    return parser.parse_args(argv)
+
+
+def choose_cities_interactive():
+    """Запрашивает список городов в диалоге."""
     print("\nВыберите города для обработки:")
     print("1. Сыктывкар")
     print("2. Москва (центр)")
@@ -32,53 +271,72 @@ def main():
     
     choice = input("\nВаш выбор (1-3): ").strip()
     
-    cities_to_process = []
-    
     if choice == "1":
-        cities_to_process.append("сыктывкар")
+        return ["сыктывкар"]
     elif choice == "2":
-        cities_to_process.append("москва_центр")
+        return ["москва_центр"]
     elif choice == "3":
-        cities_to_process.extend(["сыктывкар", "москва_центр"])
-    else:
-        print("⚠️  Неверный выбор")
-        return
+        return ["сыктывкар", "москва_центр"]
+    
+    print("⚠️  Неверный выбор")
+    return []
+
+
+def main(argv=None):
+    """
+    Пакетная обработка.
+    
+    С --cities или --config-dir работает без диалогов (подходит для cron,
+    скриптов и профилировщика); иначе спрашивает ключ и города.
+    """
+    args = parse_arguments(argv)
+    interactive = args.interactive or not (args.cities or args.config_dir)
+    
+    print(f"🏙️  ПАКЕТНАЯ ОБРАБОТКА STREETVIEWHUNTER\n{_SEP}")
     
-    total_panoramas = 0
+    api_key = args.api_key
+    if not api_key and interactive:
+        api_key = input("Введите ваш Google API ключ: ").strip()
     
-    for city in cities_to_process:
-        print(f"\n{'='*60}")
-        print(f"🔍 Обрабатываю: {city}")
-        print(f"{'='*60}")
+    if not is_valid_key(api_key):
+        print("⚠️  Необходимо указать действительный API ключ")
+        return
+    
+    enable_console_logging()
+    city_configs = None
+    if not args.config_dir:
+        if args.cities:
+            # Те же правила сопоставления ID, что и в city_profiles.py
+            cities_to_process = parse_city_ids(args.cities)
+        else:
+            cities_to_process = choose_cities_interactive()
         
-        hunter = StreetViewHunter(api_key)
+        unknown = [city for city in cities_to_process if city not in CITY_CONFIGS]
+        if unknown:
+            print(f"⚠️  Неизвестные города: {', '.join(unknown)}")
+            return
+        if not cities_to_process:
+            return
         
-        if city == "сыктывкар":
-            stats = hunter.search_area(
-                lat_min=61.66,
-                lat_max=61.69,
-                lon_min=50.81,
-                lon_max=50.86,
-                step_km=0.12,
-                search_radius=50,
-                output_file="сыктывкар_панорамы.txt"
-            )
-        elif city == "москва_центр":
-            stats = hunter.search_area(
-                lat_min=55.75,
-                lat_max=55.78,
-                lon_min=37.60,
-                lon_max=37.65,
-                step_km=0.15,
-                search_radius=80,
-                output_file="москва_центр_панорамы.txt"
-            )
+        city_configs = {city: CITY_CONFIGS[city] for city in cities_to_process}
+    
+    with BatchProcessor(
+        api_key,
+        concurrency=args.concurrency,
+        rate_per_minute=args.rate_per_minute,
+        burst=args.burst
+    ) as processor:
+        if args.config_dir:
+            results = processor.process_directory(args.config_dir)
+        else:
+            results = processor.process_city_list(city_configs)
         
-        total_panoramas += stats.get('total', 0)
+        if args.report:
+            processor.save_summary_report(args.report)
+    
+    total_panoramas = sum(result["stats"].get('total', 0) for result in results)
     
-    print(f"\n{'='*60}")
-    print(f"📊 ИТОГО: {total_panoramas} панорам")
-    print(f"{'='*60}")
+    print(f"{_NL_SEP}\n📊 ИТОГО: {total_panoramas} панорам\n{_SEP}")
 
 
 if __name__ == "__main__":
@@ -3,14 +3,17 @@
 Примеры профилей городов для StreetViewHunter.
 """
 
+import argparse
 import sys
 import os
+import unicodedata
 
 # Добавляем родительскую директорию в путь для импорта
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from streetview_hunter.core import StreetViewHunter
 
+_SEP = "=" * 60
+_NL_SEP = "\n" + _SEP
 
 # Профили городов
 CITY_PROFILES = {
@@ -50,43 +53,142 @@ CITY_PROFILES = {
 }
 
 
-def search_city(api_key, city_id):
-    """Ищет панорамы в указанном городе."""
+def _normalize_city_id(city_id):
+    """Приводит ID города к единой форме (NFKC + casefold)."""
+    return unicodedata.normalize("NFKC", city_id.strip()).casefold()
+
+
+# Нормализованный ID -> ключ CITY_PROFILES. Ввод вида «Сыктывкар» или
+# «и» + комбинируемая кратка вместо «й» находит профиль одним поиском
+_CITY_INDEX = {_normalize_city_id(city_id): city_id for city_id in CITY_PROFILES}
+
+
+def search_city(api_key, city_id, cache=None):
+    """
+    Ищет панорамы в указанном городе.
     
-    if city_id not in CITY_PROFILES:
+    Args:
+        api_key: Google Cloud API ключ
+        city_id: ID города из CITY_PROFILES
+        cache: Дисковый кэш ответов API (MetadataCache) или None
+    """
+    
+    canonical_id = _CITY_INDEX.get(_normalize_city_id(city_id))
+    
+    if canonical_id is None:
         print(f"❌ Профиль города '{city_id}' не найден")
         print(f"   Доступные города: {', '.join(CITY_PROFILES.keys())}")
         return
     
+    city_id = canonical_id
     profile = CITY_PROFILES[city_id]
     
-    print(f"\n{'='*60}")
-    print(f"🔍 Поиск в городе: {profile['name']}")
-    print(f"📝 Описание: {profile['description']}")
-    print(f"{'='*60}")
-    
-    hunter = StreetViewHunter(api_key)
-    
-    stats = hunter.search_area(
-        lat_min=profile['bounds']['lat_min'],
-        lat_max=profile['bounds']['lat_max'],
-        lon_min=profile['bounds']['lon_min'],
-        lon_max=profile['bounds']['lon_max'],
-        step_km=profile['search_params']['step_km'],
-        search_radius=profile['search_params']['search_radius'],
-        max_points=profile['search_params']['max_points'],
-        output_file=f"{city_id}_панорамы.txt",
-        delay=profile['search_params']['delay']
-    )
+    print(f"{_NL_SEP}\n"
+          f"🔍 Поиск в городе: {profile['name']}\n"
+          f"📝 Описание: {profile['description']}\n"
+          f"{_SEP}")
+    
+    # Импорт откладывается до первого поиска: requests и PyYAML
+    # (~100 мс) не нужны для показа профилей и меню
+    from streetview_hunter.core import StreetViewHunter
+    
+    with StreetViewHunter(api_key, cache=cache) as hunter:
+        stats = hunter.search_area(
+            lat_min=profile['bounds']['lat_min'],
+            lat_max=profile['bounds']['lat_max'],
+            lon_min=profile['bounds']['lon_min'],
+            lon_max=profile['bounds']['lon_max'],
+            step_km=profile['search_params']['step_km'],
+            search_radius=profile['search_params']['search_radius'],
+            max_points=profile['search_params']['max_points'],
+            output_file=f"{city_id}_панорамы.txt",
+            delay=profile['search_params']['delay']
+        )
     
     return stats
 
 
-def main():
-    """Основная функция."""
+def batch_search(api_key, city_ids, use_cache=False):
+    """
+    Ищет панорамы в нескольких городах.
+    
+    Повторы в списке отбрасываются (с сохранением порядка), поэтому
+    каждый город ищется один раз, сколько бы раз он ни был указан.
+    С use_cache ответы API сохраняются в общий дисковый кэш:
+    пересекающиеся профили и повторные запуски не запрашивают одни и те
+    же точки заново.
+    
+    Returns:
+        Словарь {ID города из CITY_PROFILES: статистика}
+    """
+    from streetview_hunter.core import enable_console_logging
+    
+    enable_console_logging()
+    results = {}
+    
+    cache = None
+    if use_cache:
+        from streetview_hunter.cache import MetadataCache
+        cache = MetadataCache()
+    
+    try:
+        # Повторы отбрасываются после приведения к ключу CITY_PROFILES:
+        # «Сыктывкар» и « сыктывкар» — один и тот же город
+        canonical_ids = (
+            _CITY_INDEX.get(_normalize_city_id(city_id), city_id)
+            for city_id in city_ids
+        )
+        for city_id in dict.fromkeys(canonical_ids):
+            stats = search_city(api_key, city_id, cache=cache)
+            if stats is not None:
+                results[city_id] = stats
+    finally:
+        if cache is not None:
+            cache.close()
+    
+    return results
+
+
+def parse_city_ids(text):
+    """Разбирает список ID городов, разделённых запятыми."""
+    return [
+        _CITY_INDEX.get(_normalize_city_id(city_id), city_id.strip())
+        for city_id in text.split(",") if city_id.strip()
+    ]
+
+
+def main(argv=None):
+    """
+    Основная функция.
     
-    print("🏙️  ПРОФИЛИ ГОРОДОВ ДЛЯ STREETVIEWHUNTER")
-    print("=" * 60)
+    С --api-key и --cities ищет панорамы без диалогов и завершается;
+    иначе (или с --interactive) работает через меню.
+    """
+    parser = argparse.ArgumentParser(description="Поиск панорам по профилям городов")
+    parser.add_argument("--api-key", help="Google Cloud API ключ")
+    parser.add_argument(
+        "--cities",
+        help=f"ID городов через запятую ({', '.join(CITY_PROFILES)})"
+    )
+    parser.add_argument("--interactive", action="store_true", help="Работать через меню")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Сохранять ответы API в дисковый кэш и брать их оттуда при "
+             "повторном поиске (~/.cache/streetview_hunter/meta.db)"
+    )
+    args = parser.parse_args(argv)
+    
+    if args.api_key and args.cities and not args.interactive:
+        from streetview_hunter.utils import is_valid_key
+        
+        if not is_valid_key(args.api_key):
+            print("⚠️  Необходимо указать действительный API ключ")
+            return
+        batch_search(args.api_key, parse_city_ids(args.cities), use_cache=args.cache)
+        return
+    
+    print(f"🏙️  ПРОФИЛИ ГОРОДОВ ДЛЯ STREETVIEWHUNTER\n{_SEP}")
     
     # Показываем доступные города
     print("\nДоступные профили городов:")
@@ -94,23 +196,25 @@ def main():
         print(f"  {i:2d}. {city_id:20} - {profile['name']}")
     
     # Запрос API ключа
-    api_key = input("\nВведите ваш Google API ключ: ").strip()
+    api_key = args.api_key or input("\nВведите ваш Google API ключ: ").strip()
+    
+    from streetview_hunter.utils import is_valid_key
     
-    if not api_key or api_key == "ВАШ_GOOGLE_API_КЛЮЧ":
+    if not is_valid_key(api_key):
         print("⚠️  Необходимо указать действительный API ключ")
         return
     
     while True:
         print("\nВыберите действие:")
-        print("  1. Поиск в конкретном городе")
+        print("  1. Поиск в городах (ID через запятую)")
         print("  0. Выход")
         
         choice = input("\nВаш выбор (0-1): ").strip()
         
         if choice == "1":
-            city_id = input("Введите ID города: ").strip().lower()
-            if city_id:
-                search_city(api_key, city_id)
+            city_ids = parse_city_ids(input("Введите ID городов: "))
+            if city_ids:
+                batch_search(api_key, city_ids, use_cache=args.cache)
         
         elif choice == "0":
             print("\n👋 До свидания!")
@@ -0,0 +1,177 @@
+"""
+Дисковый кэш ответов Street View Metadata API.
+
+Повторный поиск в той же области (например, при подборе параметров)
+берёт ответы из кэша и не тратит запросы к API.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+from .utils import json_loads, json_dumps
+
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "streetview_hunter", "meta.db"
+)
+DEFAULT_TTL = 24 * 60 * 60  # секунд
+
+# Кэшируются только ответы, описывающие саму точку; ошибки ключа,
+# превышение лимитов и т.п. должны перезапрашиваться
+CACHEABLE_STATUSES = ("OK", "ZERO_RESULTS")
+
+# Новые записи фиксируются в базе пачками: одна транзакция на 100 ответов
+COMMIT_EVERY = 100
+
+
+class MetadataCache:
+    """
+    Кэш ответов metadata API в SQLite, ключ — (широта, долгота, радиус).
+
+    Пример использования:
+    >>> with MetadataCache() as cache:
+    ...     hunter = StreetViewHunter(api_key="ВАШ_КЛЮЧ", cache=cache)
+    ...     hunter.search_area(...)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL):
+        """
+        Args:
+            path: Путь к файлу базы данных SQLite
+            ttl: Время жизни записи в секундах
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL: читатели не блокируются записью, поэтому одну базу могут
+        # одновременно использовать несколько запусков (например, пакетных)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metadata ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self.purge_expired()
+
+    @staticmethod
+    def make_key(lat: float, lon: float, radius: int) -> str:
+        """
+        Формирует ключ кэша: хэш параметров запроса (координаты округляются
+        до ~0.1 м). Одна и та же точка сетки из разных профилей и запусков
+        даёт один и тот же ключ фиксированной длины.
+        """
+        params = f"{lat:.6f},{lon:.6f},{radius}".encode()
+        return hashlib.blake2b(params, digest_size=16).hexdigest()
+
+    def get(self, lat: float, lon: float, radius: int) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает сохранённый ответ API или None, если его нет или он устарел.
+
+        Args:
+            lat: Широта точки запроса
+            lon: Долгота точки запроса
+            radius: Радиус поиска в метрах
+
+        Returns:
+            Словарь с ответом API или None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM metadata WHERE key = ?",
+                (self.make_key(lat, lon, radius),)
+            ).fetchone()
+
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return json_loads(row[0])
+
+    def set(self, lat: float, lon: float, radius: int, data: Dict[str, Any]):
+        """
+        Сохраняет ответ API, если его статус подлежит кэшированию.
+
+        Args:
+            lat: Широта точки запроса
+            lon: Долгота точки запроса
+            radius: Радиус поиска в метрах
+            data: Ответ API
+        """
+        if data.get("status") not in CACHEABLE_STATUSES:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metadata (key, payload, created_at) "
+                "VALUES (?, ?, ?)",
+                (self.make_key(lat, lon, radius),
+                 json_dumps(data, indent=False).decode('utf-8'), time.time())
+            )
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._commit()
+
+    def get_or_fetch(self, lat: float, lon: float, radius: int,
+                     fetch_fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Возвращает ответ из кэша, а при его отсутствии — результат fetch_fn,
+        который сохраняется (если статус подлежит кэшированию).
+        
+        Args:
+            lat: Широта точки запроса
+            lon: Долгота точки запроса
+            radius: Радиус поиска в метрах
+            fetch_fn: Функция без аргументов, запрашивающая ответ у API
+            
+        Returns:
+            Словарь с ответом API
+        """
+        data = self.get(lat, lon, radius)
+        if data is None:
+            data = fetch_fn()
+            self.set(lat, lon, radius, data)
+        return data
+    
+    def purge_expired(self) -> int:
+        """
+        Удаляет устаревшие записи.
+
+        Returns:
+            Количество удалённых записей
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM metadata WHERE created_at < ?",
+                (time.time() - self.ttl,)
+            )
+            self._commit()
+        return cursor.rowcount
+
+    def flush(self):
+        """Фиксирует в базе ещё не сохранённые записи."""
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        """Фиксирует транзакцию (вызывается под блокировкой)."""
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self):
+        """Фиксирует несохранённые записи и закрывает соединение с базой данных."""
+        with self._lock:
+            self._commit()
+            self._conn.close()
+
+    def __enter__(self) -> "MetadataCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
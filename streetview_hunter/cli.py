@@ -4,15 +4,24 @@
 
 import argparse
 import sys
-import yaml
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, List, TYPE_CHECKING
 
-from .core import StreetViewHunter
-from .utils import load_config, validate_coordinates
+# requests и PyYAML импортируются только после разбора и проверки
+# аргументов: --help, --version и ошибки в аргументах не ждут их загрузки
+from .utils import load_config, list_config_files, validate_coordinates, is_valid_key
 
+if TYPE_CHECKING:
+    from .core import StreetViewHunter
 
-def parse_arguments():
-    """Парсинг аргументов командной строки."""
+
+DEFAULT_CONCURRENCY = 8
+MAX_CONCURRENCY = 64
+
+
+@lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Создаёт парсер аргументов (один раз за процесс)."""
     parser = argparse.ArgumentParser(
         description="Google Street View Hunter - поиск панорам в заданной области",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -21,6 +30,7 @@ def parse_arguments():
   %(prog)s --api-key=KEY --config=configs/syktyvkar.yaml
   %(prog)s --api-key=KEY --lat-min=61.66 --lat-max=61.69 --lon-min=50.81 --lon-max=50.86
   %(prog)s --api-key=KEY --city сыктывкар --step-km 0.15 --output мои_панорамы.txt
+  %(prog)s --api-key=KEY --batch-dir=configs/
         """
     )
     
@@ -37,6 +47,11 @@ def parse_arguments():
         "--config",
         help="Путь к YAML-конфигурационному файлу"
     )
+    mode_group.add_argument(
+        "--batch-dir",
+        help="Папка с YAML-конфигурациями: поиск по каждой из них без "
+             "диалогов, результаты каждой — в свой файл"
+    )
     
     # Группа: параметры области (если нет конфига)
     area_group = parser.add_argument_group(
@@ -90,6 +105,53 @@ def parse_arguments():
         default=0.03,
         help="Задержка между запросами в секундах (по умолчанию: 0.03)"
     )
+    search_group.add_argument(
+        "--rate-per-minute",
+        type=int,
+        help="Лимит запросов к API в минуту (по умолчанию: вычисляется из --delay)"
+    )
+    search_group.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Сколько запросов можно отправить залпом сверх средней частоты, "
+             "например после быстрых ответов (по умолчанию: 1 — без всплесков)"
+    )
+    search_group.add_argument(
+        "--concurrency",
+        type=int,
+        help=f"Количество одновременных запросов, 1-{MAX_CONCURRENCY} "
+             f"(по умолчанию: из конфигурации или {DEFAULT_CONCURRENCY})"
+    )
+    
+    search_group.add_argument(
+        "--skip-covered",
+        action="store_true",
+        help="Не проверять точки, рядом с которыми панорама уже найдена "
+             "(меньше запросов при шаге сетки меньше двух радиусов)"
+    )
+    
+    search_group.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Сначала грубая сетка, затем заданный шаг только вокруг "
+             "найденных панорам (меньше запросов в районах с редкими панорамами)"
+    )
+    
+    search_group.add_argument(
+        "--cache",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="Сохранять ответы API в дисковый кэш и брать их оттуда при "
+             "повторном поиске (по умолчанию: ~/.cache/streetview_hunter/meta.db)"
+    )
+    search_group.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=1.0,
+        help="Срок хранения ответов в кэше в днях (по умолчанию: 1)"
+    )
     
     # Группа: выходные данные
     output_group = parser.add_argument_group("Выходные данные")
@@ -115,19 +177,43 @@ def parse_arguments():
         help="Подробный вывод"
     )
     
-    return parser.parse_args()
+    return parser
+
+
+def parse_arguments(argv: Optional[List[str]] = None):
+    """
+    Парсинг аргументов командной строки.
+    
+    Args:
+        argv: Список аргументов (по умолчанию sys.argv[1:])
+    """
+    return _build_parser().parse_args(argv)
 
 
 def validate_arguments(args):
     """Проверка корректности аргументов."""
     
+    import os
+    
+    if not is_valid_key(args.api_key):
+        print("❌ Ошибка: --api-key не похож на ключ Google API")
+        return False
+    
+    if args.config and args.batch_dir:
+        print("❌ Ошибка: --config и --batch-dir нельзя указывать одновременно")
+        return False
+    
     # Если указан конфиг, проверяем его существование
     if args.config:
-        import os
         if not os.path.exists(args.config):
             print(f"❌ Ошибка: файл конфигурации '{args.config}' не найден")
             return False
     
+    elif args.batch_dir:
+        if not os.path.isdir(args.batch_dir):
+            print(f"❌ Ошибка: папка '{args.batch_dir}' не найдена")
+            return False
+    
     # Если конфиг не указан, проверяем обязательные параметры области
     else:
         required = ['lat_min', 'lat_max', 'lon_min', 'lon_max']
@@ -162,12 +248,90 @@ def validate_arguments(args):
         print("❌ Ошибка: --max-points должен быть больше 0")
         return False
     
+    if args.rate_per_minute is not None and args.rate_per_minute <= 0:
+        print("❌ Ошибка: --rate-per-minute должен быть больше 0")
+        return False
+    
+    if args.cache_ttl_days <= 0:
+        print("❌ Ошибка: --cache-ttl-days должен быть больше 0")
+        return False
+    
+    if args.burst <= 0:
+        print("❌ Ошибка: --burst должен быть больше 0")
+        return False
+    
+    if args.concurrency is not None and not 0 < args.concurrency <= MAX_CONCURRENCY:
+        print(f"❌ Ошибка: --concurrency должен быть от 1 до {MAX_CONCURRENCY}")
+        return False
+    
     if args.delay < 0.01:
         print("⚠️  Предупреждение: очень маленькая задержка может привести к блокировке API")
     
     return True
 
 
+def run_batch(hunter: "StreetViewHunter", config_dir: str, verbose: bool = False,
+              concurrency: Optional[int] = None, skip_covered: bool = False,
+              adaptive: bool = False) -> int:
+    """
+    Выполняет поиск по всем YAML-конфигурациям папки.
+    
+    Конфигурации с ошибкой YAML, без обязательных ключей или с
+    некорректной областью пропускаются с предупреждением.
+    
+    Args:
+        hunter: Охотник, общий для всех конфигураций (одна HTTP-сессия)
+        config_dir: Папка с конфигурациями
+        verbose: Подробный вывод
+        concurrency: Число одновременных запросов вместо указанного
+            в конфигурациях (None — как в конфигурации)
+        skip_covered: Включить skip_covered для всех конфигураций
+            (False — как в конфигурации)
+        adaptive: Включить адаптивный поиск для всех конфигураций
+            (False — как в конфигурации)
+        
+    Returns:
+        Общее количество найденных панорам
+    """
+    import yaml
+    
+    config_files = list_config_files(config_dir)
+    total = 0
+    
+    for config_path in config_files:
+        if verbose:
+            print(f"📁 Загружаю конфигурацию из: {config_path}")
+        
+        try:
+            config = load_config(config_path)
+            bounds = config['bounds']
+            validate_coordinates(
+                bounds['lat_min'], bounds['lat_max'],
+                bounds['lon_min'], bounds['lon_max']
+            )
+        except (KeyError, ValueError, TypeError, yaml.YAMLError) as e:
+            # Некорректный, пустой (None вместо словаря) или неполный файл
+            # не должен прерывать обработку остальных
+            print(f"⚠️  Пропускаю {config_path}: {e}")
+            continue
+        
+        if concurrency is not None:
+            config['search_params']['concurrency'] = concurrency
+        if skip_covered:
+            config['search_params']['skip_covered'] = True
+        if adaptive:
+            config['search_params']['adaptive'] = True
+        
+        # Сессия общая, но панорамы одной конфигурации не должны
+        # попадать в файл результатов следующей
+        hunter.reset()
+        stats = hunter.search_from_config(config)
+        total += stats.get('total', 0)
+    
+    print(f"\n📊 ИТОГО: {total} панорам в {len(config_files)} конфигурациях")
+    return total
+
+
 def main():
     """Основная функция CLI."""
     
@@ -178,16 +342,45 @@ def main():
     if not validate_arguments(args):
         sys.exit(1)
     
+    from .core import StreetViewHunter, enable_console_logging
+    from .cache import MetadataCache, DEFAULT_CACHE_PATH
+    from .ratelimit import TokenBucket, AdaptiveTokenBucket
+    
+    enable_console_logging()
+    
     # Создание охотника
+    cache = None
     try:
-        hunter = StreetViewHunter(args.api_key)
+        if args.cache is not None:
+            cache = MetadataCache(args.cache or DEFAULT_CACHE_PATH,
+                                  ttl=args.cache_ttl_days * 24 * 60 * 60)
+        
+        rate_limiter = None
+        if args.rate_per_minute:
+            # Заданный лимит — потолок: после отказов API частота
+            # снижается и затем постепенно возвращается к нему
+            rate_limiter = AdaptiveTokenBucket(
+                rate=args.rate_per_minute / 60, capacity=args.burst
+            )
+        elif args.burst > 1 and args.delay > 0:
+            rate_limiter = TokenBucket(rate=1 / args.delay, capacity=args.burst)
+        
+        hunter = StreetViewHunter(args.api_key, cache=cache,
+                                  rate_limiter=rate_limiter)
     except Exception as e:
         print(f"❌ Ошибка создания StreetViewHunter: {e}")
         sys.exit(1)
     
     # Запуск поиска
     try:
-        if args.config:
+        if args.batch_dir:
+            # Пакетный режим: все конфигурации папки подряд
+            run_batch(hunter, args.batch_dir, verbose=args.verbose,
+                      concurrency=args.concurrency,
+                      skip_covered=args.skip_covered,
+                      adaptive=args.adaptive)
+        
+        elif args.config:
             # Режим с конфигурационным файлом
             if args.verbose:
                 print(f"📁 Загружаю конфигурацию из: {args.config}")
@@ -197,6 +390,12 @@ def main():
             # Переопределяем выходной файл, если указан в аргументах
             if args.output != "panoramas.txt":
                 config['output']['filename'] = args.output
+            if args.concurrency is not None:
+                config['search_params']['concurrency'] = args.concurrency
+            if args.skip_covered:
+                config['search_params']['skip_covered'] = True
+            if args.adaptive:
+                config['search_params']['adaptive'] = True
             
             stats = hunter.search_from_config(config)
             
@@ -216,7 +415,10 @@ def main():
                 search_radius=args.search_radius,
                 max_points=args.max_points,
                 output_file=args.output,
-                delay=args.delay
+                delay=args.delay,
+                concurrency=args.concurrency or DEFAULT_CONCURRENCY,
+                skip_covered=args.skip_covered,
+                adaptive=args.adaptive
             )
         
         # Вывод дополнительной статистики
@@ -238,6 +440,12 @@ def main():
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    
+    finally:
+        # Закрываем HTTP-сессию охотника (пул keep-alive соединений) и кэш
+        hunter.close()
+        if cache is not None:
+            cache.close()
 
 
 if __name__ == "__main__":
@@ -4,40 +4,190 @@
 """
 
 import requests
-import csv
+from requests.adapters import HTTPAdapter
 import time
 import math
-from typing import List, Tuple, Dict, Optional, Any
+import random
+import itertools
+import threading
+import logging
+import sys
+from logging.handlers import MemoryHandler
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Optional, Any, Iterable, Iterator
 from datetime import datetime
 
+from .cache import MetadataCache
+from .output import ResultWriter
+from .ratelimit import TokenBucket
+from .utils import json_loads
+
+
+# Разделители консольного вывода
+_SEP = "=" * 60
+_NL_SEP = "\n" + _SEP
+_THIN_SEP = "-" * 60
+
+# Эллипсоид WGS84: метров в радиане экваториальной окружности и квадрат
+# эксцентриситета
+_WGS84_M = 6378137.0 * math.pi / 180
+_WGS84_E2 = (1 / 298.257223563) * (2 - 1 / 298.257223563)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Пишет в текущий sys.stdout, даже если его подменили после импорта."""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _ThrottledMemoryHandler(MemoryHandler):
+    """
+    Буфер сообщений журнала: сбрасывается пачкой при заполнении и сразу
+    при сообщении уровня WARNING и выше (отказы по лимиту, ошибки), а
+    строки прогресса — при следующей записи, если с прошлого сброса
+    прошло interval секунд. Таймера нет: без новых записей буфер ждёт.
+    """
+
+    def __init__(self, capacity: int, target: logging.Handler, interval: float = 1.0):
+        super().__init__(capacity, flushLevel=logging.WARNING, target=target)
+        self.interval = interval
+        self._last_flush = time.monotonic()
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        return (super().shouldFlush(record)
+                or time.monotonic() - self._last_flush >= self.interval)
+
+    def flush(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+
+
+# Сообщения из цикла поиска (прогресс, ошибки отдельных точек, отказы по
+# лимиту) идут через журнал, а не через print; итоговые сводки печатаются
+# напрямую. Библиотека обработчики не добавляет: консольный вывод включают
+# точки входа (CLI, примеры) вызовом enable_console_logging
+logger = logging.getLogger("streetview_hunter")
+
+
+def enable_console_logging(level: int = logging.INFO):
+    """
+    Выводит сообщения поиска в stdout через буфер на 100 записей.
+    
+    stdout не сбрасывается на каждой строке прогресса: строки прогресса
+    выводятся пачкой при следующей записи, если с прошлого вывода прошло
+    больше секунды, а предупреждения и ошибки — сразу. Повторный вызов
+    ничего не меняет.
+    
+    Args:
+        level: Минимальный уровень выводимых сообщений
+    """
+    logger.setLevel(level)
+    if any(isinstance(h, _ThrottledMemoryHandler) for h in logger.handlers):
+        return
+    
+    console = _StdoutHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_ThrottledMemoryHandler(capacity=100, target=console))
+
+
+def _flush_log():
+    """Сбрасывает буфер журнала перед прямым выводом в консоль."""
+    for handler in logger.handlers:
+        handler.flush()
+
 
 class StreetViewHunter:
     """
     Основной класс для поиска панорам Google Street View.
     
     Пример использования:
-    >>> hunter = StreetViewHunter(api_key="ВАШ_КЛЮЧ")
-    >>> stats = hunter.search_area(
-    ...     lat_min=61.66, lat_max=61.69,
-    ...     lon_min=50.81, lon_max=50.86,
-    ...     step_km=0.12,
-    ...     search_radius=50,
-    ...     output_file="панорамы.txt"
-    ... )
+    >>> with StreetViewHunter(api_key="ВАШ_КЛЮЧ") as hunter:
+    ...     stats = hunter.search_area(
+    ...         lat_min=61.66, lat_max=61.69,
+    ...         lon_min=50.81, lon_max=50.86,
+    ...         step_km=0.12,
+    ...         search_radius=50,
+    ...         output_file="панорамы.txt"
+    ...     )
+    
+    Одна HTTP-сессия (и её пул keep-alive соединений) обслуживает все
+    запросы к API; при выходе из блока ``with`` она закрывается.
     """
     
-    def __init__(self, api_key: str):
+    # Пауза после отказа по лимиту: 1, 2, 4, ... секунд, но не больше 60
+    RATE_LIMIT_PAUSE_MAX = 60.0
+    
+    # Во сколько раз шаг грубой сетки адаптивного поиска больше заданного
+    ADAPTIVE_FACTOR = 4
+    
+    # Повторы запроса точки при временных сбоях (обрыв соединения, таймаут,
+    # HTTP 5xx, отказ по лимиту): попыток всего, начальная и максимальная
+    # пауза экспоненциальной задержки в секундах
+    RETRY_ATTEMPTS = 3
+    RETRY_BACKOFF = 0.5
+    RETRY_BACKOFF_MAX = 8.0
+    RETRY_STATUSES = (500, 502, 503, 504)
+    
+    def __init__(self, api_key: str,
+                 cache: Optional[MetadataCache] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
         """
         Инициализация охотника за панорамами.
         
         Args:
             api_key: Ключ Google Cloud API с доступом к Street View Static API
+            cache: Дисковый кэш ответов API (None — без кэширования)
+            rate_limiter: Общий ограничитель частоты запросов. Позволяет
+                нескольким охотникам делить одну квоту; если не задан,
+                частота определяется параметром delay в search_area
         """
         self.api_key = api_key
         self.session = requests.Session()
-        self.found_panos = {}  # pano_id -> данные панорамы
+        self._pool_size = 0
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self._lock = threading.Lock()  # защищает счётчики и found_panos
+        self.reset()
+        
+    def reset(self):
+        """
+        Сбрасывает результаты и счётчики перед поиском в новой области.
+        
+        HTTP-сессия (и её открытые соединения) сохраняется, поэтому один
+        охотник может последовательно обработать несколько областей.
+        """
+        self.found_panos = set()  # pano_id найденных панорам
+        # Точные координаты найденных панорам (для адаптивного поиска);
+        # сами данные панорам сразу уходят в файлы результатов
+        self._found_points = []
         self.request_count = 0
+        self.cache_hits = 0
+        self._rate_limit_strikes = 0  # отказы по лимиту подряд
         self.start_time = None
+        self.skipped_points = 0
+        # Пространственный хэш найденных панорам для skip_covered:
+        # (ячейка по широте, ячейка по долготе) -> [(широта, долгота)]
+        self._covered_cells = None
+        self._cell_size = (0.0, 0.0)
+        # Метров в градусе широты и долготы на средней широте текущей
+        # области (None — вычислять для каждой пары точек)
+        self._meters_per_deg = None
+    
+    def close(self):
+        """Закрывает HTTP-сессию и освобождает соединения пула."""
+        self.session.close()
+    
+    def __enter__(self) -> "StreetViewHunter":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
         
     def search_area(self, 
                    lat_min: float, lat_max: float,
@@ -46,7 +196,10 @@ class StreetViewHunter:
                    search_radius: int = 50,
                    max_points: int = 1000,
                    output_file: str = "panoramas.txt",
-                   delay: float = 0.03) -> Dict[str, Any]:
+                   delay: float = 0.03,
+                   concurrency: int = 8,
+                   skip_covered: bool = False,
+                   adaptive: bool = False) -> Dict[str, Any]:
         """
         Поиск панорам в указанной области.
         
@@ -59,93 +212,145 @@ class StreetViewHunter:
             search_radius: Радиус поиска в метрах (рекомендуется 30-100)
             max_points: Максимальное количество точек для проверки
             output_file: Имя выходного файла
-            delay: Задержка между запросами в секундах
+            delay: Минимальный интервал между запросами в секундах
+                (не более 1/delay запросов в секунду); не используется,
+                если охотнику передан общий rate_limiter
+            concurrency: Количество одновременных запросов к API
+            skip_covered: Не запрашивать точки, в радиусе поиска которых уже
+                есть найденная панорама (экономит запросы при шаге сетки
+                меньше двух радиусов, но может пропустить соседнюю панораму)
+            adaptive: Двухпроходный поиск: сначала сетка с шагом в
+                ADAPTIVE_FACTOR раз крупнее, затем шаг step_km только вокруг
+                найденных панорам (многократно меньше запросов там, где
+                панорамы редки: леса, вода, окраины)
             
         Returns:
             Словарь со статистикой поиска
         """
         # Начало работы
         self.start_time = time.time()
-        print(f"\n{'='*60}")
-        print(f"🔍 GOOGLE STREET VIEW HUNTER v1.0")
-        print(f"{'='*60}")
-        print(f"Область поиска:")
-        print(f"  Широта:  {lat_min:.5f} → {lat_max:.5f}")
-        print(f"  Долгота: {lon_min:.5f} → {lon_max:.5f}")
-        print(f"  Размер:  {lat_max-lat_min:.3f}° × {lon_max-lon_min:.3f}°")
-        print(f"Параметры:")
-        print(f"  Шаг сетки:     {step_km} км (~{step_km*1000:.0f} м)")
-        print(f"  Радиус поиска: {search_radius} м")
-        print(f"  Макс. точек:   {max_points}")
-        print(f"{'='*60}")
-        
-        # Генерация точек сетки
-        points = self._generate_grid(
-            lat_min, lat_max, lon_min, lon_max, step_km
-        )
-        
-        # Ограничение количества точек
-        if len(points) > max_points:
-            print(f"⚠️  Ограничение: будет проверено {max_points} из {len(points)} точек")
-            points = points[:max_points]
-        
-        print(f"📊 Точек для проверки: {len(points)}")
-        print(f"⏱️  Ориентировочное время: {len(points)*delay/60:.1f} минут")
-        print(f"{'-'*60}")
-        
-        # Поиск панорам
-        results = []
-        found_count = 0
-        
-        for i, (lat, lon) in enumerate(points):
-            # Прогресс
-            if i % 50 == 0 and i > 0:
-                elapsed = time.time() - self.start_time
-                speed = i / elapsed if elapsed > 0 else 0
-                remaining = (len(points) - i) / speed if speed > 0 else 0
-                print(f"  {i}/{len(points)} точек | "
-                      f"Найдено: {found_count} | "
-                      f"Скорость: {speed:.1f} точек/сек | "
-                      f"Осталось: {remaining/60:.1f} мин")
-            
-            # Поиск панорамы
-            panorama = self._find_nearest_panorama(lat, lon, search_radius)
-            
-            if panorama:
-                results.append(panorama)
-                found_count += 1
+        print("\n".join([
+            _NL_SEP,
+            "🔍 GOOGLE STREET VIEW HUNTER v1.0",
+            _SEP,
+            "Область поиска:",
+            f"  Широта:  {lat_min:.5f} → {lat_max:.5f}",
+            f"  Долгота: {lon_min:.5f} → {lon_max:.5f}",
+            f"  Размер:  {lat_max-lat_min:.3f}° × {lon_max-lon_min:.3f}°",
+            "Параметры:",
+            f"  Шаг сетки:     {step_km} км (~{step_km*1000:.0f} м)",
+            f"  Радиус поиска: {search_radius} м",
+            f"  Макс. точек:   {max_points}",
+            f"  Потоков:       {concurrency}",
+            _SEP
+        ]))
+        
+        # Генерация точек сетки (в адаптивном режиме — грубой)
+        grid_step = step_km * self.ADAPTIVE_FACTOR if adaptive else step_km
+        lats, lons = self._grid_axes(lat_min, lat_max, lon_min, lon_max, grid_step)
+        total_points = len(lats) * len(lons)
+        
+        # Ограничение количества точек: в список попадают только
+        # проверяемые точки, а не вся сетка
+        if total_points > max_points:
+            print(f"⚠️  Ограничение: будет проверено {max_points} из {total_points} точек")
+        points = list(itertools.islice(
+            self._iter_grid(lat_min, lat_max, lon_min, lon_max, grid_step),
+            max_points
+        ))
+        
+        print(f"📊 Точек для проверки: {len(points)}\n"
+              f"⏱️  Ориентировочное время: {len(points)*delay/60:.1f} минут\n"
+              f"{_THIN_SEP}")
+        
+        # Поиск панорам: запросы выполняются параллельно, а их частоту
+        # ограничивает общее "ведро с токенами" (1/delay запросов в секунду).
+        # Найденные панорамы сразу пишутся в файлы результатов
+        #
+        # Масштаб один для всей области (в пределах города он меняется
+        # на доли процента), поэтому считается один раз
+        self._meters_per_deg = self._meters_per_degree((lat_min + lat_max) / 2)
+        if skip_covered:
+            # Ячейка — квадрат со стороной search_radius: панорамы в радиусе
+            # от точки могут лежать только в её ячейке и восьми соседних
+            self._cell_size = (search_radius / self._meters_per_deg[0],
+                               search_radius / self._meters_per_deg[1])
+            self._covered_cells = {}
+        else:
+            self._covered_cells = None
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter
+        else:
+            bucket = TokenBucket(rate=1 / delay) if delay > 0 else None
+        self._ensure_pool_size(concurrency)
+        
+        writer = ResultWriter(output_file)
+        try:
+            found_count = self._search_points(
+                points, search_radius, bucket, concurrency, writer
+            )
+            checked = len(points)
             
-            # Задержка для соблюдения лимитов
-            time.sleep(delay)
-        
-        # Сохранение результатов
-        stats = self._save_results(results, output_file)
+            if adaptive and found_count and checked < max_points:
+                hits = list(self._found_points)
+                fine_points = self._densify_grid(
+                    lat_min, lat_max, lon_min, lon_max,
+                    step_km, self.ADAPTIVE_FACTOR, hits
+                )[:max_points - checked]
+                
+                print(f"{_THIN_SEP}\n"
+                      f"🔎 Уточнение вокруг найденных панорам: {len(fine_points)} точек")
+                found_count += self._search_points(
+                    fine_points, search_radius, bucket, concurrency, writer,
+                    found_before=found_count
+                )
+                checked += len(fine_points)
+        finally:
+            # При прерывании уже найденные панорамы остаются в файлах
+            writer.close()
+            # Масштаб относится только к этой области: прямые вызовы
+            # _calculate_distance после поиска считают его для своих точек
+            self._meters_per_deg = None
+        
+        stats = writer.summary()
         
         # Вывод итогов
         elapsed_total = time.time() - self.start_time
-        efficiency = (found_count / len(points) * 100) if points else 0
-        
-        print(f"\n{'='*60}")
-        print(f"✅ ПОИСК ЗАВЕРШЕН!")
-        print(f"{'='*60}")
-        print(f"📊 РЕЗУЛЬТАТЫ:")
-        print(f"  Проверено точек:    {len(points)}")
-        print(f"  Найдено панорам:    {found_count}")
-        print(f"  Эффективность:      {efficiency:.1f}%")
-        print(f"  Запросов к API:     {self.request_count}")
-        print(f"  Время выполнения:   {elapsed_total:.1f} сек")
-        print(f"  Средняя скорость:   {len(points)/elapsed_total:.1f} точек/сек")
-        print(f"\n💾 ФАЙЛЫ:")
-        print(f"  Ссылки:             {output_file}")
-        print(f"  Детальный отчёт:    {stats['csv_file']}")
+        efficiency = (found_count / checked * 100) if checked else 0
+        
+        lines = [
+            _NL_SEP,
+            "✅ ПОИСК ЗАВЕРШЕН!",
+            _SEP,
+            "📊 РЕЗУЛЬТАТЫ:",
+            f"  Проверено точек:    {checked}",
+            f"  Найдено панорам:    {found_count}",
+            f"  Эффективность:      {efficiency:.1f}%",
+            f"  Запросов к API:     {self.request_count}"
+        ]
+        if self.cache is not None:
+            lines.append(f"  Ответов из кэша:    {self.cache_hits}")
+        if skip_covered:
+            lines.append(f"  Пропущено точек:    {self.skipped_points}")
+        lines += [
+            f"  Время выполнения:   {elapsed_total:.1f} сек",
+            f"  Средняя скорость:   {checked/elapsed_total:.1f} точек/сек",
+            "\n💾 ФАЙЛЫ:",
+            f"  Ссылки:             {output_file}",
+            f"  Детальный отчёт:    {stats['csv_file']}"
+        ]
         
         if found_count == 0:
-            print(f"\n⚠️  ПАНОРАМЫ НЕ НАЙДЕНЫ!")
-            print(f"   Возможные причины:")
-            print(f"   1. Неверный API ключ")
-            print(f"   2. Street View Static API не активирован")
-            print(f"   3. В указанной области нет панорам Google")
-            print(f"   4. Исчерпан дневной лимит запросов")
+            lines += [
+                "\n⚠️  ПАНОРАМЫ НЕ НАЙДЕНЫ!",
+                "   Возможные причины:",
+                "   1. Неверный API ключ",
+                "   2. Street View Static API не активирован",
+                "   3. В указанной области нет панорам Google",
+                "   4. Исчерпан дневной лимит запросов"
+            ]
+        
+        print("\n".join(lines))
         
         return stats
     
@@ -168,9 +373,67 @@ class StreetViewHunter:
             search_radius=config['search_params'].get('search_radius', 50),
             max_points=config['search_params'].get('max_points', 1000),
             output_file=config['output'].get('filename', 'panoramas.txt'),
-            delay=config['search_params'].get('delay', 0.03)
+            delay=config['search_params'].get('delay', 0.03),
+            concurrency=config['search_params'].get('concurrency', 8),
+            skip_covered=config['search_params'].get('skip_covered', False),
+            adaptive=config['search_params'].get('adaptive', False)
         )
     
+    def _search_points(self,
+                       points: List[Tuple[float, float]],
+                       search_radius: int,
+                       bucket: Optional[TokenBucket],
+                       concurrency: int,
+                       writer: ResultWriter,
+                       found_before: int = 0) -> int:
+        """
+        Проверяет точки параллельно и записывает найденные панорамы.
+        
+        Args:
+            points: Точки для проверки
+            search_radius: Радиус поиска в метрах
+            bucket: Ограничитель частоты запросов или None
+            concurrency: Количество одновременных запросов к API
+            writer: Запись результатов
+            found_before: Панорам найдено ранее (для вывода прогресса)
+            
+        Returns:
+            Количество найденных панорам
+        """
+        found_count = 0
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        futures = [
+            executor.submit(self._find_nearest_panorama, lat, lon, search_radius, bucket)
+            for lat, lon in points
+        ]
+        
+        started = time.time()
+        try:
+            for i, future in enumerate(futures):
+                # Прогресс
+                if i % 50 == 0 and i > 0:
+                    elapsed = time.time() - started
+                    speed = i / elapsed if elapsed > 0 else 0
+                    remaining = (len(points) - i) / speed if speed > 0 else 0
+                    logger.info("  %d/%d точек | Найдено: %d | "
+                                "Скорость: %.1f точек/сек | Осталось: %.1f мин",
+                                i, len(points), found_before + found_count,
+                                speed, remaining / 60)
+                
+                panorama = future.result()
+                
+                if panorama:
+                    writer.write(panorama)
+                    found_count += 1
+        finally:
+            # При прерывании (Ctrl+C) не ждём оставшиеся точки
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+            _flush_log()
+        
+        return found_count
+    
     def _generate_grid(self,
                       lat_min: float, lat_max: float,
                       lon_min: float, lon_max: float,
@@ -188,6 +451,75 @@ class StreetViewHunter:
         Returns:
             Список кортежей (широта, долгота)
         """
+        return list(self._iter_grid(lat_min, lat_max, lon_min, lon_max, step_km))
+    
+    def _iter_grid(self,
+                   lat_min: float, lat_max: float,
+                   lon_min: float, lon_max: float,
+                   step_km: float, start: int = 0) -> Iterator[Tuple[float, float]]:
+        """
+        Перебирает точки сетки по строкам широты, не собирая их в список.
+        
+        В памяти хранятся только оси сетки, поэтому первые max_points точек
+        огромной области или продолжение прерванного поиска с точки start
+        не требуют строить всю сетку.
+        
+        Args:
+            lat_min: Минимальная широта
+            lat_max: Максимальная широта
+            lon_min: Минимальная долгота
+            lon_max: Максимальная долгота
+            step_km: Шаг в километрах
+            start: Номер точки, с которой начать (как в _generate_grid)
+            
+        Returns:
+            Итератор кортежей (широта, долгота)
+        """
+        lats, lons = self._grid_axes(lat_min, lat_max, lon_min, lon_max, step_km)
+        if not lats or not lons:
+            # Перепутанные границы: точек нет
+            return iter(())
+        
+        # Пропуск первых start точек: целые строки отбрасываются срезом,
+        # а внутри строки пропускается не больше одной строки точек
+        row, col = divmod(start, len(lons))
+        return itertools.islice(itertools.product(lats[row:], lons), col, None)
+    
+    def _grid_axes(self,
+                   lat_min: float, lat_max: float,
+                   lon_min: float, lon_max: float,
+                   step_km: float) -> Tuple[List[float], List[float]]:
+        """
+        Оси сетки: широты строк и долготы столбцов.
+        
+        Args:
+            lat_min: Минимальная широта
+            lat_max: Максимальная широта
+            lon_min: Минимальная долгота
+            lon_max: Максимальная долгота
+            step_km: Шаг в километрах
+            
+        Returns:
+            Кортеж (список широт, список долгот)
+        """
+        step_lat, step_lon = self._grid_steps(lat_min, lat_max, step_km)
+        return (self._grid_axis(lat_min, lat_max, step_lat),
+                self._grid_axis(lon_min, lon_max, step_lon))
+    
+    @staticmethod
+    def _grid_steps(lat_min: float, lat_max: float,
+                    step_km: float) -> Tuple[float, float]:
+        """
+        Переводит шаг сетки из километров в градусы.
+        
+        Args:
+            lat_min: Минимальная широта
+            lat_max: Максимальная широта
+            step_km: Шаг в километрах
+            
+        Returns:
+            Кортеж (шаг по широте, шаг по долготе) в градусах
+        """
         # Средняя широта для расчёта коэффициента
         avg_lat = (lat_min + lat_max) / 2
         
@@ -195,35 +527,137 @@ class StreetViewHunter:
         km_per_degree_lat = 111.0
         km_per_degree_lon = 111.0 * math.cos(math.radians(avg_lat))
         
-        # Шаг в градусах
-        step_lat = step_km / km_per_degree_lat
-        step_lon = step_km / km_per_degree_lon
+        return step_km / km_per_degree_lat, step_km / km_per_degree_lon
+    
+    @staticmethod
+    def _grid_axis(start: float, stop: float, step: float) -> List[float]:
+        """
+        Строит ось сетки start, start + step, ... не дальше stop.
         
-        points = []
-        lat = lat_min
+        Значения вычисляются как start + i*step, без накопления ошибки
+        округления. Небольшой допуск не теряет граничную точку, когда
+        отношение диапазона к шагу чуть меньше целого (0.01 / 0.01 =
+        0.999...), а min() не выпускает её за stop из-за того же округления.
+        При stop < start ось пуста.
+        """
+        if stop < start:
+            return []
+        count = int((stop - start) / step + 1e-9) + 1
+        return [min(start + i * step, stop) for i in range(count)]
+    
+    def _densify_grid(self,
+                      lat_min: float, lat_max: float,
+                      lon_min: float, lon_max: float,
+                      step_km: float, factor: int,
+                      hits: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        """
+        Точки мелкой сетки вокруг панорам, найденных на грубой сетке.
+        
+        Грубая сетка (шаг step_km * factor) делит область на ячейки с
+        центрами в своих точках; возвращаются точки сетки с шагом step_km
+        из ячеек, где найдена хотя бы одна панорама, кроме уже проверенных
+        точек грубой сетки.
+        
+        Args:
+            lat_min: Минимальная широта
+            lat_max: Максимальная широта
+            lon_min: Минимальная долгота
+            lon_max: Максимальная долгота
+            step_km: Шаг мелкой сетки в километрах
+            factor: Во сколько раз шаг грубой сетки крупнее
+            hits: Координаты найденных панорам
+            
+        Returns:
+            Список кортежей (широта, долгота)
+        """
+        step_lat, step_lon = self._grid_steps(lat_min, lat_max, step_km)
+        lats = self._grid_axis(lat_min, lat_max, step_lat)
+        lons = self._grid_axis(lon_min, lon_max, step_lon)
+        
+        cells = {
+            (math.floor((lat - lat_min) / (step_lat * factor) + 0.5),
+             math.floor((lon - lon_min) / (step_lon * factor) + 0.5))
+            for lat, lon in hits
+        }
         
-        while lat <= lat_max:
-            lon = lon_min
-            while lon <= lon_max:
-                points.append((lat, lon))
-                lon += step_lon
-            lat += step_lat
+        offset = factor // 2
+        points = []
+        for cell_lat, cell_lon in sorted(cells):
+            first_i = cell_lat * factor - offset
+            first_j = cell_lon * factor - offset
+            for i in range(max(0, first_i), min(len(lats), first_i + factor)):
+                for j in range(max(0, first_j), min(len(lons), first_j + factor)):
+                    # Точки грубой сетки уже проверены первым проходом
+                    if i % factor or j % factor:
+                        points.append((lats[i], lons[j]))
         
         return points
     
-    def _find_nearest_panorama(self,
-                              lat: float, lon: float,
-                              radius: int) -> Optional[Dict[str, Any]]:
+    def _ensure_pool_size(self, size: int):
         """
-        Ищет ближайшую панораму к заданной точке.
+        Расширяет пул keep-alive соединений сессии до size.
+        
+        По умолчанию requests держит 10 соединений на хост: при большем
+        числе потоков лишние соединения закрываются после каждого запроса,
+        и каждый следующий запрос заново проходит TCP+TLS рукопожатие.
+        
+        Args:
+            size: Требуемое количество соединений (обычно равно concurrency)
+        """
+        if size <= self._pool_size:
+            return
+        
+        # Все запросы идут на один хост maps.googleapis.com
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        self.session.mount("https://", adapter)
+        self._pool_size = size
+    
+    def _fetch_metadata(self,
+                        lat: float, lon: float,
+                        radius: int,
+                        bucket: Optional[TokenBucket] = None) -> Dict[str, Any]:
+        """
+        Получает ответ metadata API для точки: из кэша или запросом к Google.
         
         Args:
             lat: Широта
             lon: Долгота
             radius: Радиус поиска в метрах
+            bucket: Ограничитель частоты запросов или None
             
         Returns:
-            Словарь с данными панорамы или None
+            Словарь с ответом API
+        """
+        if self.cache is None:
+            return self._request_metadata(lat, lon, radius, bucket)
+        
+        fetched = []
+        
+        def fetch():
+            fetched.append(True)
+            return self._request_metadata(lat, lon, radius, bucket)
+        
+        data = self.cache.get_or_fetch(lat, lon, radius, fetch)
+        if not fetched:
+            with self._lock:
+                self.cache_hits += 1
+        return data
+    
+    def _request_metadata(self,
+                          lat: float, lon: float,
+                          radius: int,
+                          bucket: Optional[TokenBucket] = None) -> Dict[str, Any]:
+        """
+        Запрашивает metadata API для точки (с учётом ограничителя частоты).
+        
+        Args:
+            lat: Широта
+            lon: Долгота
+            radius: Радиус поиска в метрах
+            bucket: Ограничитель частоты запросов или None
+            
+        Returns:
+            Словарь с ответом API
         """
         url = "https://maps.googleapis.com/maps/api/streetview/metadata"
         params = {
@@ -232,17 +666,107 @@ class StreetViewHunter:
             "key": self.api_key
         }
         
+        for attempt in range(1, self.RETRY_ATTEMPTS + 1):
+            if bucket is not None:
+                bucket.acquire()
+            
+            with self._lock:
+                self.request_count += 1
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, timeout=10)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.RETRY_ATTEMPTS:
+                    raise
+                self._backoff(attempt)
+                continue
+            
+            if response.status_code in self.RETRY_STATUSES and attempt < self.RETRY_ATTEMPTS:
+                self._backoff(attempt)
+                continue
+            break
+        
+        if response.status_code == 429:
+            # HTTP 429 приходит без тела в формате metadata API
+            data = {"status": "OVER_QUERY_LIMIT"}
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                data["retry_after"] = float(retry_after)
+            return data
+        # Ошибка сервера и после повторов (тело — не JSON metadata API)
+        if response.status_code in self.RETRY_STATUSES:
+            response.raise_for_status()
+        
+        data = json_loads(response.content)
+        if bucket is not None and data.get("status") in ("OK", "ZERO_RESULTS"):
+            bucket.record_success(time.monotonic() - started)
+        return data
+    
+    def _backoff(self, attempt: int):
+        """
+        Ждёт перед повтором запроса: экспоненциальная задержка со случайным
+        разбросом («full jitter»), чтобы потоки не повторяли запросы разом.
+        
+        Args:
+            attempt: Номер неудачной попытки (с 1)
+        """
+        delay = min(self.RETRY_BACKOFF_MAX, self.RETRY_BACKOFF * 2 ** (attempt - 1))
+        time.sleep(random.uniform(0, delay))
+    
+    def _find_nearest_panorama(self,
+                              lat: float, lon: float,
+                              radius: int,
+                              bucket: Optional[TokenBucket] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ищет ближайшую панораму к заданной точке.
+        
+        Args:
+            lat: Широта
+            lon: Долгота
+            radius: Радиус поиска в метрах
+            bucket: Ограничитель частоты запросов или None
+            
+        Returns:
+            Словарь с данными панорамы или None
+        """
+        if self._covered_cells is not None and self._is_covered(lat, lon, radius):
+            with self._lock:
+                self.skipped_points += 1
+            return None
+        
         try:
-            self.request_count += 1
-            response = self.session.get(url, params=params, timeout=10)
-            data = response.json()
+            data = self._fetch_metadata(lat, lon, radius, bucket)
+            
+            # Отказ по лимиту: все потоки приостанавливаются через общий
+            # ограничитель, после чего точка запрашивается снова
+            attempt = 1
+            while data.get("status") == "OVER_QUERY_LIMIT":
+                pause = self._on_rate_limited(bucket, data.get("retry_after", 0.0))
+                logger.warning("\n⚠️  ПРЕВЫШЕН ЛИМИТ ЗАПРОСОВ!")
+                if pause:
+                    logger.warning("   Запросы приостановлены на %.0f сек", pause)
+                logger.warning("   Если ошибка повторяется, подождите 24 часа "
+                               "или увеличьте квоту в Google Cloud")
+                if not pause or attempt >= self.RETRY_ATTEMPTS:
+                    return None
+                data = self._fetch_metadata(lat, lon, radius, bucket)
+                attempt += 1
+            
+            # Любой успешный ответ (в том числе «панорам нет») означает,
+            # что лимит больше не превышен
+            if data.get("status") in ("OK", "ZERO_RESULTS"):
+                with self._lock:
+                    self._rate_limit_strikes = 0
             
             if data.get("status") == "OK":
                 pano_id = data["pano_id"]
                 
-                # Проверка на дубликаты
-                if pano_id in self.found_panos:
-                    return None
+                # Проверка на дубликаты (с резервированием pano_id, чтобы
+                # параллельные запросы не вернули одну панораму дважды)
+                with self._lock:
+                    if pano_id in self.found_panos:
+                        return None
+                    self.found_panos.add(pano_id)
                 
                 # Точные координаты от Google
                 exact_lat = data["location"]["lat"]
@@ -267,22 +791,82 @@ class StreetViewHunter:
                     "found_at": datetime.now().isoformat()
                 }
                 
-                # Сохраняем в кэш
-                self.found_panos[pano_id] = panorama_data
+                self._found_points.append((exact_lat, exact_lng))
+                if self._covered_cells is not None:
+                    self._mark_covered(exact_lat, exact_lng)
                 return panorama_data
             
-            elif data.get("status") == "OVER_QUERY_LIMIT":
-                print(f"\n⚠️  ПРЕВЫШЕН ЛИМИТ ЗАПРОСОВ!")
-                print(f"   Подождите 24 часа или увеличьте квоту в Google Cloud")
-                return None
                 
         except requests.exceptions.RequestException as e:
-            print(f"    Ошибка сети: {e}")
+            logger.warning("    Ошибка сети: %s", e)
         except Exception as e:
-            print(f"    Ошибка обработки: {e}")
+            logger.error("    Ошибка обработки: %s", e)
         
         return None
     
+    def _cell_of(self, lat: float, lon: float) -> Tuple[int, int]:
+        """Ячейка пространственного хэша, в которую попадает точка."""
+        return (math.floor(lat / self._cell_size[0]),
+                math.floor(lon / self._cell_size[1]))
+    
+    def _mark_covered(self, lat: float, lon: float):
+        """Запоминает найденную панораму в пространственном хэше."""
+        with self._lock:
+            self._covered_cells.setdefault(self._cell_of(lat, lon), []).append((lat, lon))
+    
+    def _is_covered(self, lat: float, lon: float, radius: int) -> bool:
+        """
+        Проверяет, есть ли уже найденная панорама в радиусе от точки.
+        
+        Args:
+            lat: Широта
+            lon: Долгота
+            radius: Радиус поиска в метрах
+            
+        Returns:
+            True если запрос для точки можно не выполнять
+        """
+        cell_lat, cell_lon = self._cell_of(lat, lon)
+        with self._lock:
+            nearby = [
+                pano
+                for d_lat in (-1, 0, 1)
+                for d_lon in (-1, 0, 1)
+                for pano in self._covered_cells.get((cell_lat + d_lat, cell_lon + d_lon), ())
+            ]
+        return any(
+            self._calculate_distance(lat, lon, pano_lat, pano_lon) <= radius
+            for pano_lat, pano_lon in nearby
+        )
+    
+    def _on_rate_limited(self, bucket: Optional[TokenBucket],
+                         retry_after: float = 0.0) -> float:
+        """
+        Приостанавливает общий ограничитель после отказа API по лимиту.
+        
+        Пауза растёт экспоненциально с каждым отказом подряд и
+        сбрасывается после первого успешного ответа; если сервер указал
+        Retry-After, пауза не короче него. Отказы остальных потоков,
+        пришедшие во время уже начатой паузы, счётчик не увеличивают.
+        
+        Args:
+            bucket: Ограничитель частоты запросов или None
+            retry_after: Значение заголовка Retry-After в секундах (0 — нет)
+            
+        Returns:
+            Длительность паузы в секундах (0, если ограничителя нет)
+        """
+        if bucket is None:
+            return 0.0
+        
+        with self._lock:
+            pause = min(self.RATE_LIMIT_PAUSE_MAX,
+                        max(2.0 ** self._rate_limit_strikes, retry_after))
+            if bucket.pause(pause):
+                self._rate_limit_strikes += 1
+        
+        return pause
+    
     def _create_panorama_link(self, pano_id: str, lat: float, lng: float) -> str:
         """
         Создаёт ссылку на панораму Google Street View.
@@ -313,72 +897,56 @@ class StreetViewHunter:
         Returns:
             Расстояние в метрах
         """
-        # Упрощённый расчёт (достаточно точный для небольших расстояний)
-        dlat = (lat2 - lat1) * 111000  # метров в градусе широты
-        dlon = (lon2 - lon1) * 111000 * math.cos(math.radians((lat1 + lat2) / 2))
-        return math.sqrt(dlat**2 + dlon**2)
+        # Равнопромежуточная проекция: на расстояниях до километра её
+        # погрешность — доли метра, а в отличие от acos(скалярное
+        # произведение) нет потери точности на близких точках: одна и та
+        # же точка даёт ровно 0
+        meters_per_deg = self._meters_per_deg
+        if meters_per_deg is None:
+            meters_per_deg = self._meters_per_degree((lat1 + lat2) / 2)
+        
+        dlat = (lat2 - lat1) * meters_per_deg[0]
+        dlon = (lon2 - lon1) * meters_per_deg[1]
+        return math.hypot(dlat, dlon)
+    
+    @staticmethod
+    def _meters_per_degree(lat: float) -> Tuple[float, float]:
+        """
+        Длина градуса широты и долготы на эллипсоиде WGS84 («cheap ruler»).
+        
+        В отличие от сферы с градусом 111 км учитывает сплюснутость Земли:
+        на широтах России градус широты длиннее на ~0.4%, а погрешность
+        расстояний до сотен километров остаётся меньше 0.1%.
+        
+        Args:
+            lat: Широта в градусах
+            
+        Returns:
+            Кортеж (метров в градусе широты, метров в градусе долготы)
+        """
+        cos_lat = math.cos(math.radians(lat))
+        w2 = 1 / (1 - _WGS84_E2 * (1 - cos_lat * cos_lat))
+        w = math.sqrt(w2)
+        return _WGS84_M * w * w2 * (1 - _WGS84_E2), _WGS84_M * w * cos_lat
     
     def _save_results(self,
-                     results: List[Dict[str, Any]],
+                     results: Iterable[Dict[str, Any]],
                      output_file: str) -> Dict[str, Any]:
         """
         Сохраняет результаты поиска в файлы.
         
         Args:
-            results: Список найденных панорам
+            results: Найденные панорамы — список или генератор (читается
+                постепенно, целиком в памяти не собирается)
             output_file: Имя основного файла
             
         Returns:
             Словарь с информацией о созданных файлах
         """
-        if not results:
-            return {
-                "total": 0,
-                "txt_file": "",
-                "csv_file": "",
-                "stats": {}
-            }
-        
-        # 1. Сохраняем ссылки в TXT
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for item in results:
-                f.write(item["link"] + '\n')
-        
-        # 2. Сохраняем детальный отчёт в CSV
-        csv_file = output_file.replace('.txt', '_details.csv')
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                "pano_id", "latitude", "longitude", "date",
-                "distance_m", "searched_from", "found_at", "link"
-            ])
-            
-            for item in results:
-                writer.writerow([
-                    item["pano_id"],
-                    f"{item['lat']:.10f}",
-                    f"{item['lng']:.10f}",
-                    item.get("date", ""),
-                    f"{item.get('distance_m', 0):.1f}",
-                    item["searched_from"],
-                    item["found_at"],
-                    item["link"]
-                ])
-        
-        # 3. Собираем статистику
-        stats = {
-            "total": len(results),
-            "avg_distance": sum(item.get('distance_m', 0) for item in results) / len(results),
-            "unique_dates": len(set(item.get('date', '') for item in results if item.get('date'))),
-            "search_date": datetime.now().isoformat()
-        }
+        with ResultWriter(output_file) as writer:
+            writer.write_many(results)
         
-        return {
-            "total": len(results),
-            "txt_file": output_file,
-            "csv_file": csv_file,
-            "stats": stats
-        }
+        return writer.summary()
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -391,6 +959,7 @@ class StreetViewHunter:
         
         return {
             "requests": self.request_count,
+            "cache_hits": self.cache_hits,
             "found_panos": len(self.found_panos),
             "elapsed_seconds": elapsed,
             "requests_per_second": self.request_count / elapsed if elapsed > 0 else 0
@@ -0,0 +1,152 @@
+"""
+Запись найденных панорам в файлы результатов.
+"""
+
+import csv
+import itertools
+from datetime import datetime
+from typing import Dict, Any, Iterable, List
+
+
+CSV_HEADER = [
+    "pano_id", "latitude", "longitude", "date",
+    "distance_m", "searched_from", "found_at", "link"
+]
+
+# Размер буфера записи: сотни строк на один системный вызов write
+WRITE_BUFFER_SIZE = 1 << 16
+
+# Сколько панорам формируется в памяти перед записью (см. write_many)
+WRITE_BATCH_SIZE = 1000
+
+
+class ResultWriter:
+    """
+    Потоковая запись панорам в TXT (ссылки) и CSV (детальный отчёт).
+
+    Каждая панорама записывается сразу по мере нахождения, поэтому при
+    прерывании поиска уже найденное остаётся в файлах, а для итоговой
+    статистики хранятся только счётчики. Файлы создаются при первой
+    записи: если панорам нет, файлов тоже нет.
+
+    Пример использования:
+    >>> with ResultWriter("панорамы.txt") as writer:
+    ...     writer.write(panorama)
+    >>> writer.summary()
+    """
+
+    def __init__(self, output_file: str):
+        """
+        Args:
+            output_file: Имя TXT-файла; CSV получает суффикс _details.csv
+        """
+        self.output_file = output_file
+        self.csv_file = output_file.replace('.txt', '_details.csv')
+        self.total = 0
+        self._distance_sum = 0.0
+        self._dates = set()
+        self._txt = None
+        self._csv = None
+        self._writer = None
+
+    def _open(self):
+        """Открывает оба файла и пишет заголовок CSV."""
+        self._txt = open(self.output_file, 'w', encoding='utf-8',
+                         buffering=WRITE_BUFFER_SIZE)
+        self._csv = open(self.csv_file, 'w', newline='', encoding='utf-8',
+                         buffering=WRITE_BUFFER_SIZE)
+        self._writer = csv.writer(self._csv)
+        self._writer.writerow(CSV_HEADER)
+
+    def write(self, item: Dict[str, Any]):
+        """
+        Записывает одну панораму.
+
+        Args:
+            item: Данные панорамы (как их возвращает поиск)
+        """
+        self._write_batch([item])
+
+    def write_many(self, items: Iterable[Dict[str, Any]]):
+        """
+        Записывает несколько панорам: строки формируются пачками по
+        WRITE_BATCH_SIZE и уходят в файлы одним вызовом write/writerows
+        на пачку. Итератор читается постепенно, поэтому в памяти никогда
+        не оказывается больше одной пачки.
+
+        Args:
+            items: Данные панорам (как их возвращает поиск), любой итерируемый объект
+        """
+        items = iter(items)
+        while True:
+            batch = list(itertools.islice(items, WRITE_BATCH_SIZE))
+            if not batch:
+                return
+            self._write_batch(batch)
+
+    def _write_batch(self, items: List[Dict[str, Any]]):
+        """Записывает одну пачку панорам."""
+        if self._txt is None:
+            self._open()
+
+        self._txt.write(''.join(item["link"] + '\n' for item in items))
+        self._writer.writerows([self._row(item) for item in items])
+
+        for item in items:
+            self._distance_sum += item.get('distance_m', 0)
+            if item.get('date'):
+                self._dates.add(item['date'])
+        self.total += len(items)
+
+    @staticmethod
+    def _row(item: Dict[str, Any]) -> List[str]:
+        """Строка CSV для одной панорамы (в порядке CSV_HEADER)."""
+        return [
+            item["pano_id"],
+            f"{item['lat']:.10f}",
+            f"{item['lng']:.10f}",
+            item.get("date", ""),
+            f"{item.get('distance_m', 0):.1f}",
+            item["searched_from"],
+            item["found_at"],
+            item["link"]
+        ]
+
+    def close(self):
+        """Сбрасывает буферы и закрывает файлы."""
+        for f in (self._txt, self._csv):
+            if f is not None:
+                f.close()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Возвращает информацию о записанных файлах и статистику.
+
+        Returns:
+            Словарь с ключами total, txt_file, csv_file, stats
+        """
+        if not self.total:
+            return {
+                "total": 0,
+                "txt_file": "",
+                "csv_file": "",
+                "stats": {}
+            }
+
+        return {
+            "total": self.total,
+            "txt_file": self.output_file,
+            "csv_file": self.csv_file,
+            "stats": {
+                "total": self.total,
+                "avg_distance": self._distance_sum / self.total,
+                "unique_dates": len(self._dates),
+                "search_date": datetime.now().isoformat()
+            }
+        }
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,171 @@
+"""
+Ограничение частоты запросов к Google Street View API.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Потокобезопасный ограничитель частоты по алгоритму «ведро с токенами».
+
+    Токены пополняются со скоростью ``rate`` в секунду, но их запас не
+    превышает ``capacity``. Каждый запрос забирает один токен; если токенов
+    нет, :meth:`acquire` ждёт ровно столько, сколько нужно для появления
+    следующего.
+
+    Пример использования:
+    >>> bucket = TokenBucket(rate=30)  # не более 30 запросов в секунду
+    >>> bucket.acquire()
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Скорость пополнения (токенов в секунду)
+            capacity: Максимальный запас токенов (размер допустимого всплеска)
+
+        Raises:
+            ValueError: Если rate или capacity не положительны
+        """
+        if rate <= 0:
+            raise ValueError(f"rate должен быть больше 0, получено: {rate}")
+        if capacity <= 0:
+            raise ValueError(f"capacity должен быть больше 0, получено: {capacity}")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Забирает один токен, при необходимости ожидая его появления."""
+        with self._lock:
+            now = time.monotonic()
+            # Во время паузы (см. pause) _last_refill находится в будущем
+            if now > self._last_refill:
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._last_refill) * self.rate
+                )
+                self._last_refill = now
+
+            # Токен резервируется сразу: при нехватке баланс уходит в минус,
+            # и каждый поток ждёт свою очередь, не блокируя остальные
+            self._tokens -= 1
+            wait = self._last_refill - now
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> bool:
+        """
+        Приостанавливает выдачу токенов всем потокам на seconds секунд.
+
+        Используется при ответе API о превышении лимита: ведро общее для
+        всех потоков (и всех охотников, которым оно передано), поэтому
+        замедляются сразу все запросы, а не только получивший отказ.
+        Отказы запросов, отправленных до паузы, приходят, пока она уже
+        идёт: это тот же случай перегрузки, и такие вызовы игнорируются.
+
+        Args:
+            seconds: Длительность паузы
+
+        Returns:
+            True, если пауза начата; False, если пауза уже шла
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._last_refill > now:
+                return False
+            self._last_refill = now + seconds
+            # Накопленный запас не расходуется залпом сразу после паузы
+            self._tokens = min(self._tokens, 0.0)
+            return True
+
+    def record_success(self, latency: float):
+        """
+        Сообщает об успешном ответе API (для адаптивных ограничителей).
+
+        Args:
+            latency: Время ответа в секундах
+        """
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Ограничитель с адаптивной частотой по схеме AIMD.
+
+    Каждый отказ API по лимиту (см. :meth:`pause`) вдвое снижает частоту,
+    но не ниже ``min_rate``; пока средняя задержка последних ответов не
+    превышает ``latency_target``, каждый успешный ответ повышает частоту на
+    ``increase``, вплоть до исходной ``rate``. Так поток запросов держится
+    у реального лимита ключа, не упираясь в него раз за разом.
+
+    Пример использования:
+    >>> bucket = AdaptiveTokenBucket(rate=30)  # не более 30 запросов в секунду
+    >>> bucket.acquire()
+    >>> bucket.record_success(0.12)
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 min_rate: Optional[float] = None, increase: Optional[float] = None,
+                 latency_target: float = 0.5, window: int = 50):
+        """
+        Args:
+            rate: Максимальная скорость (токенов в секунду), с неё начинается работа
+            capacity: Максимальный запас токенов (размер допустимого всплеска)
+            min_rate: Нижняя граница скорости (по умолчанию rate / 16)
+            increase: Прирост скорости за успешный ответ (по умолчанию rate / 100)
+            latency_target: Средняя задержка ответа, выше которой скорость не растёт
+            window: Число последних ответов для расчёта средней задержки
+
+        Raises:
+            ValueError: Если rate или capacity не положительны
+        """
+        super().__init__(rate, capacity)
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.increase = increase if increase is not None else rate / 100
+        self.latency_target = latency_target
+        self._latencies = deque(maxlen=window)
+        self._latency_sum = 0.0
+
+    def pause(self, seconds: float) -> bool:
+        """
+        Приостанавливает выдачу токенов и вдвое снижает частоту — один раз
+        на случай перегрузки (см. :meth:`TokenBucket.pause`).
+
+        Args:
+            seconds: Длительность паузы
+
+        Returns:
+            True, если пауза начата; False, если пауза уже шла
+        """
+        if not super().pause(seconds):
+            return False
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+        return True
+
+    def record_success(self, latency: float):
+        """
+        Учитывает успешный ответ и при низкой задержке повышает частоту.
+
+        Args:
+            latency: Время ответа в секундах
+        """
+        with self._lock:
+            if len(self._latencies) == self._latencies.maxlen:
+                self._latency_sum -= self._latencies[0]
+            self._latencies.append(latency)
+            self._latency_sum += latency
+
+            if self._latency_sum / len(self._latencies) <= self.latency_target:
+                self.rate = min(self.max_rate, self.rate + self.increase)
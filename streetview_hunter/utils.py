@@ -2,16 +2,95 @@
 Вспомогательные функции для StreetViewHunter.
 """
 
-import yaml
 import json
-from typing import Dict, Any, Tuple
+import copy
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Union
 import math
 
+try:
+    import orjson
+except ImportError:  # orjson — необязательное ускорение
+    orjson = None
+
+
+@lru_cache(maxsize=1)
+def _yaml() -> Tuple[Any, Any, Any]:
+    """
+    Импортирует PyYAML при первой работе с YAML.
+    
+    Импорт занимает десятки миллисекунд, а CLI с --help, --version или
+    ошибкой в аргументах до YAML не доходит.
+    
+    Returns:
+        Кортеж (модуль yaml, загрузчик, сериализатор)
+    """
+    import yaml
+    
+    # libyaml (C-реализация) разбирает и записывает YAML в разы быстрее
+    try:
+        from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    except ImportError:  # PyYAML собран без libyaml
+        from yaml import SafeLoader, SafeDumper
+    
+    return yaml, SafeLoader, SafeDumper
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Разбирает JSON, используя orjson, если он установлен.
+    
+    Args:
+        data: JSON-документ (bytes или str)
+        
+    Returns:
+        Разобранный объект
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, indent: bool = True) -> bytes:
+    """
+    Сериализует объект в JSON (UTF-8), используя orjson, если он установлен.
+    
+    Args:
+        obj: Сериализуемый объект
+        indent: Форматировать с отступом 2 (иначе — компактная запись)
+        
+    Returns:
+        JSON-документ в кодировке UTF-8
+    """
+    if orjson is not None:
+        # Нестроковые ключи словарей допускаются, как и в json
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+# Разобранные конфигурации: хэш содержимого файла -> конфигурация (LRU)
+_CONFIG_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_CONFIG_CACHE_MAXSIZE = 100
+
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """
     Загружает конфигурацию из YAML-файла.
     
+    Файл с уже встречавшимся содержимым (тот же или другой путь) не
+    разбирается заново: возвращается копия разобранной конфигурации.
+    Ключ кэша — хэш содержимого, поэтому перезапись файла видна сразу,
+    даже если время изменения и размер не поменялись.
+    
     Args:
         config_path: Путь к YAML-файлу
         
@@ -22,8 +101,17 @@ def load_config(config_path: str) -> Dict[str, Any]:
         FileNotFoundError: Если файл не найден
         yaml.YAMLError: Если файл содержит ошибки YAML
     """
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
+    with open(config_path, 'rb') as f:
+        content = f.read()
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    
+    cached = _CONFIG_CACHE.get(digest)
+    if cached is not None:
+        _CONFIG_CACHE.move_to_end(digest)
+        return copy.deepcopy(cached)
+    
+    yaml, loader, _ = _yaml()
+    config = yaml.load(content, Loader=loader)
     
     # Валидация минимальной конфигурации
     required_keys = ['bounds', 'search_params', 'output']
@@ -31,9 +119,35 @@ def load_config(config_path: str) -> Dict[str, Any]:
         if key not in config:
             raise ValueError(f"В конфигурации отсутствует обязательный ключ: {key}")
     
+    # Вызывающий код может менять конфигурацию (например, имя выходного
+    # файла), поэтому в кэше хранится отдельная копия
+    _CONFIG_CACHE[digest] = copy.deepcopy(config)
+    if len(_CONFIG_CACHE) > _CONFIG_CACHE_MAXSIZE:
+        _CONFIG_CACHE.popitem(last=False)
     return config
 
 
+def list_config_files(config_dir: str) -> List[str]:
+    """
+    Возвращает отсортированные пути к YAML-конфигурациям в папке.
+    
+    os.scandir отдаёт тип записи вместе с именем, поэтому подпапки и
+    прочие не-файлы отсеиваются без отдельного stat для каждой записи.
+    
+    Args:
+        config_dir: Папка с конфигурациями
+        
+    Returns:
+        Список путей к файлам .yaml/.yml
+    """
+    with os.scandir(config_dir) as entries:
+        return sorted(
+            entry.path for entry in entries
+            if entry.name.endswith(('.yaml', '.yml'))
+            and entry.is_file(follow_symlinks=False)
+        )
+
+
 def save_config(config: Dict[str, Any], config_path: str):
     """
     Сохраняет конфигурацию в YAML-файл.
@@ -42,8 +156,10 @@ def save_config(config: Dict[str, Any], config_path: str):
         config: Словарь с конфигурацией
         config_path: Путь для сохранения файла
     """
+    yaml, _, dumper = _yaml()
     with open(config_path, 'w', encoding='utf-8') as f:
-        yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
+        yaml.dump(config, f, Dumper=dumper,
+                  default_flow_style=False, allow_unicode=True)
 
 
 def validate_coordinates(lat_min: float, lat_max: float,
@@ -94,6 +210,44 @@ def validate_coordinates(lat_min: float, lat_max: float,
     return True
 
 
+# Заглушка из примеров и документации вместо настоящего ключа
+_PLACEHOLDER_KEY = "ВАШ_GOOGLE_API_КЛЮЧ"
+
+# Ключи Google API — 39 символов из латиницы, цифр, "_" и "-" (с запасом)
+_API_KEY_RE = re.compile(r"^[A-Za-z0-9_\-]{35,45}$")
+
+
+def is_valid_key(api_key: str) -> bool:
+    """
+    Проверяет, похожа ли строка на ключ Google API.
+    
+    Проверяется только формат: ключ с опечаткой отсеивается сразу, без
+    запроса к API, который всё равно вернул бы отказ.
+    
+    Args:
+        api_key: Проверяемый ключ
+        
+    Returns:
+        True если ключ непустой, не заглушка и имеет формат ключа Google
+    """
+    return (bool(api_key) and api_key != _PLACEHOLDER_KEY
+            and _API_KEY_RE.match(api_key) is not None)
+
+
+@lru_cache(maxsize=32)
+def km_per_degree_lon(lat: float) -> float:
+    """
+    Возвращает длину одного градуса долготы на заданной широте.
+    
+    Args:
+        lat: Широта в градусах
+        
+    Returns:
+        Километров в градусе долготы
+    """
+    return 111.0 * math.cos(math.radians(lat))
+
+
 def calculate_area_size(lat_min: float, lat_max: float,
                        lon_min: float, lon_max: float) -> Tuple[float, float]:
     """
@@ -108,13 +262,10 @@ def calculate_area_size(lat_min: float, lat_max: float,
     """
     avg_lat = (lat_min + lat_max) / 2
     
-    # Коэффициенты преобразования
-    km_per_degree_lat = 111.0
-    km_per_degree_lon = 111.0 * math.cos(math.radians(avg_lat))
-    
-    # Размеры в километрах
-    width_km = (lon_max - lon_min) * km_per_degree_lon
-    height_km = (lat_max - lat_min) * km_per_degree_lat
+    # Размеры в километрах (cos широты кэшируется: при показе сводки
+    # и оценке числа точек считается одна и та же область)
+    width_km = (lon_max - lon_min) * km_per_degree_lon(avg_lat)
+    height_km = (lat_max - lat_min) * 111.0
     
     return (width_km, height_km)
 
@@ -171,8 +322,10 @@ def save_results_json(results: list, output_path: str):
         results: Список найденных панорам
         output_path: Путь для сохранения файла
     """
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    # Документ сериализуется целиком и записывается одним вызовом write,
+    # а не множеством мелких записей, которые делает json.dump
+    with open(output_path, 'wb') as f:
+        f.write(json_dumps(results))
 
 
 def load_results_json(input_path: str) -> list:
@@ -185,5 +338,5 @@ def load_results_json(input_path: str) -> list:
     Returns:
         Список панорам
     """
-    with open(input_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(input_path, 'rb') as f:
+        return json_loads(f.read())
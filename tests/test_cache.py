@@ -0,0 +1,75 @@
+"""
+Тесты для модуля cache.py
+"""
+
+import pytest
+from streetview_hunter.cache import MetadataCache
+
+
+class TestMetadataCache:
+    """Тесты дискового кэша ответов API."""
+    
+    def test_set_and_get(self, tmp_path):
+        """Тест сохранения и чтения ответа."""
+        data = {"status": "OK", "pano_id": "test_id", "date": "2023-07"}
+        
+        with MetadataCache(str(tmp_path / "meta.db")) as cache:
+            cache.set(61.66, 50.83, 50, data)
+            
+            assert cache.get(61.66, 50.83, 50) == data
+            assert cache.get(61.66, 50.83, 80) is None  # другой радиус
+    
+    def test_persists_between_instances(self, tmp_path):
+        """Тест: записи сохраняются на диске между запусками."""
+        path = str(tmp_path / "meta.db")
+        
+        with MetadataCache(path) as cache:
+            cache.set(61.66, 50.83, 50, {"status": "ZERO_RESULTS"})
+        
+        with MetadataCache(path) as cache:
+            assert cache.get(61.66, 50.83, 50) == {"status": "ZERO_RESULTS"}
+    
+    def test_flush_commits_pending(self, tmp_path):
+        """Тест: записи пачки видны другим подключениям после flush."""
+        path = str(tmp_path / "meta.db")
+        
+        with MetadataCache(path) as writer, MetadataCache(path) as reader:
+            writer.set(61.66, 50.83, 50, {"status": "ZERO_RESULTS"})
+            assert reader.get(61.66, 50.83, 50) is None
+            
+            writer.flush()
+            assert reader.get(61.66, 50.83, 50) == {"status": "ZERO_RESULTS"}
+    
+    def test_errors_not_cached(self, tmp_path):
+        """Тест: ошибки API не кэшируются."""
+        with MetadataCache(str(tmp_path / "meta.db")) as cache:
+            cache.set(61.66, 50.83, 50, {"status": "OVER_QUERY_LIMIT"})
+            
+            assert cache.get(61.66, 50.83, 50) is None
+    
+    def test_get_or_fetch(self, tmp_path):
+        """Тест: при промахе вызывается fetch_fn, при попадании — нет."""
+        calls = []
+        
+        def fetch():
+            calls.append(True)
+            return {"status": "OK", "pano_id": "test_id"}
+        
+        with MetadataCache(str(tmp_path / "meta.db")) as cache:
+            first = cache.get_or_fetch(61.66, 50.83, 50, fetch)
+            second = cache.get_or_fetch(61.66, 50.83, 50, fetch)
+        
+        assert first == second == {"status": "OK", "pano_id": "test_id"}
+        assert len(calls) == 1
+    
+    def test_expired_entries(self, tmp_path):
+        """Тест: устаревшие записи не возвращаются и удаляются."""
+        with MetadataCache(str(tmp_path / "meta.db"), ttl=-1) as cache:
+            cache.set(61.66, 50.83, 50, {"status": "OK", "pano_id": "test_id"})
+            
+            assert cache.get(61.66, 50.83, 50) is None
+            assert cache.purge_expired() == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,38 @@
+"""
+Тесты для примера examples/city_profiles.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples"))
+
+import city_profiles
+
+
+class TestBatchSearch:
+    """Тесты поиска по нескольким городам."""
+    
+    def test_duplicates_are_searched_once(self, monkeypatch):
+        """Тест: ID одного города в разном регистре ищутся один раз."""
+        searched = []
+        
+        def fake_search_city(api_key, city_id, cache=None):
+            searched.append(city_id)
+            return {"total": 1}
+        
+        monkeypatch.setattr(city_profiles, "search_city", fake_search_city)
+        monkeypatch.setattr("streetview_hunter.core.enable_console_logging", lambda: None)
+        
+        results = city_profiles.batch_search(
+            "key", ["москва_центр", "МОСКВА_ЦЕНТР", " Москва_Центр ", "сыктывкар"]
+        )
+        
+        assert searched == ["москва_центр", "сыктывкар"]
+        assert list(results) == ["москва_центр", "сыктывкар"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+"""
+Тесты для модуля cli.py
+"""
+
+import pytest
+from unittest.mock import Mock
+from streetview_hunter.cli import (
+    parse_arguments, validate_arguments, run_batch, _build_parser
+)
+
+
+API_KEY = "AIza" + "A" * 35
+
+
+def write_config(path):
+    """Записывает корректную конфигурацию области."""
+    path.write_text(
+        "name: Город\n"
+        "bounds: {lat_min: 61.66, lat_max: 61.69, lon_min: 50.81, lon_max: 50.86}\n"
+        "search_params: {step_km: 0.5}\n"
+        "output: {filename: out.txt}\n",
+        encoding="utf-8"
+    )
+
+
+class TestCli:
+    """Тесты интерфейса командной строки."""
+    
+    def test_parse_arguments_defaults(self):
+        """Тест значений по умолчанию."""
+        args = parse_arguments(["--api-key=test_key"])
+        
+        assert args.api_key == "test_key"
+        assert args.step_km == 0.15
+        assert args.search_radius == 50
+        assert args.output == "panoramas.txt"
+        assert args.concurrency is None
+        assert args.cache is None
+    
+    def test_parse_arguments_cache(self):
+        """Тест флага --cache с путём и без него."""
+        assert parse_arguments(["--api-key=test_key", "--cache"]).cache == ""
+        assert parse_arguments(
+            ["--api-key=test_key", "--cache", "meta.db"]
+        ).cache == "meta.db"
+    
+    def test_parser_is_reused(self):
+        """Тест: парсер создаётся один раз."""
+        parse_arguments(["--api-key=test_key"])
+        
+        assert _build_parser() is _build_parser()
+    
+    def test_validate_arguments_rejects_malformed_key(self):
+        """Тест: ключ неверного формата отклоняется без запросов к API."""
+        args = parse_arguments([
+            "--api-key=test_key",
+            "--lat-min=61.66", "--lat-max=61.69",
+            "--lon-min=50.81", "--lon-max=50.86"
+        ])
+        
+        assert validate_arguments(args) is False
+    
+    def test_validate_arguments_requires_area(self):
+        """Тест: без --config нужны все границы области."""
+        args = parse_arguments([f"--api-key={API_KEY}", "--lat-min=61.66"])
+        
+        assert validate_arguments(args) is False
+    
+    def test_validate_arguments_area(self):
+        """Тест корректных параметров области."""
+        args = parse_arguments([
+            f"--api-key={API_KEY}",
+            "--lat-min=61.66", "--lat-max=61.69",
+            "--lon-min=50.81", "--lon-max=50.86"
+        ])
+        
+        assert validate_arguments(args) is True
+    
+    @pytest.mark.parametrize("concurrency", ["0", "65"])
+    def test_validate_arguments_concurrency_range(self, concurrency):
+        """Тест: число потоков ограничено диапазоном 1-64."""
+        args = parse_arguments([
+            f"--api-key={API_KEY}",
+            "--lat-min=61.66", "--lat-max=61.69",
+            "--lon-min=50.81", "--lon-max=50.86",
+            f"--concurrency={concurrency}"
+        ])
+        
+        assert validate_arguments(args) is False
+    
+    def test_validate_arguments_batch_dir(self, tmp_path):
+        """Тест пакетного режима: границы области не требуются."""
+        args = parse_arguments([f"--api-key={API_KEY}", f"--batch-dir={tmp_path}"])
+        
+        assert validate_arguments(args) is True
+
+    
+    def test_run_batch_skips_bad_files(self, tmp_path):
+        """Тест: битый или пустой YAML пропускается, остальные обрабатываются."""
+        write_config(tmp_path / "a_good.yaml")
+        (tmp_path / "b_invalid.yaml").write_text("invalid: yaml: [", encoding="utf-8")
+        (tmp_path / "c_empty.yaml").write_text("", encoding="utf-8")
+        
+        hunter = Mock()
+        hunter.search_from_config.return_value = {"total": 2}
+        
+        assert run_batch(hunter, str(tmp_path)) == 2
+        assert hunter.search_from_config.call_count == 1
+
+    
+    def test_run_batch_forwards_skip_covered(self, tmp_path):
+        """Тест: --skip-covered действует и в пакетном режиме."""
+        write_config(tmp_path / "city.yaml")
+        hunter = Mock()
+        hunter.search_from_config.return_value = {"total": 0}
+        
+        run_batch(hunter, str(tmp_path), skip_covered=True)
+        
+        config = hunter.search_from_config.call_args.args[0]
+        assert config["search_params"]["skip_covered"] is True
+
+    
+    def test_run_batch_forwards_adaptive(self, tmp_path):
+        """Тест: --adaptive действует и в пакетном режиме."""
+        write_config(tmp_path / "city.yaml")
+        hunter = Mock()
+        hunter.search_from_config.return_value = {"total": 0}
+        
+        run_batch(hunter, str(tmp_path), adaptive=True)
+        
+        config = hunter.search_from_config.call_args.args[0]
+        assert config["search_params"]["adaptive"] is True
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
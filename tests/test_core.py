@@ -2,9 +2,48 @@
 Тесты для модуля core.py
 """
 
+import json
+import logging
+import threading
+from urllib.parse import parse_qs, urlparse
+
 import pytest
-from unittest.mock import Mock, patch
-from streetview_hunter.core import StreetViewHunter
+import requests
+from requests.adapters import BaseAdapter
+from unittest.mock import Mock
+from streetview_hunter.core import (
+    StreetViewHunter, _ThrottledMemoryHandler, enable_console_logging, logger
+)
+
+
+METADATA_URL = "https://maps.googleapis.com/maps/api/streetview/metadata"
+
+
+class StubAdapter(BaseAdapter):
+    """
+    Транспорт requests, отвечающий заданным JSON без обращения к сети.
+    
+    Монтируется в настоящую сессию охотника, поэтому тест проходит весь
+    путь requests: сборку URL с параметрами, Response и его content.
+    """
+    
+    def __init__(self, payload, status_code=200):
+        super().__init__()
+        self.payload = payload
+        self.status_code = status_code
+        self.requests = []
+    
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        response = requests.Response()
+        response.status_code = self.status_code
+        response._content = json.dumps(self.payload).encode()
+        response.url = request.url
+        response.request = request
+        return response
+    
+    def close(self):
+        pass
 
 
 class TestStreetViewHunter:
@@ -17,6 +56,38 @@ class TestStreetViewHunter:
         assert hunter.request_count == 0
         assert len(hunter.found_panos) == 0
     
+    def test_context_manager_closes_session(self):
+        """Тест закрытия HTTP-сессии при выходе из блока with."""
+        with StreetViewHunter(api_key="test_key") as hunter:
+            hunter.session = Mock()
+        
+        hunter.session.close.assert_called_once()
+    
+    def test_reset_keeps_session(self):
+        """Тест сброса результатов между областями без смены сессии."""
+        hunter = StreetViewHunter(api_key="test_key")
+        session = hunter.session
+        hunter.found_panos.add("pano")
+        hunter.request_count = 5
+        
+        hunter.reset()
+        
+        assert hunter.found_panos == set()
+        assert hunter.request_count == 0
+        assert hunter.session is session
+    
+    def test_ensure_pool_size(self):
+        """Тест расширения пула соединений под число потоков."""
+        hunter = StreetViewHunter(api_key="test_key")
+        
+        hunter._ensure_pool_size(32)
+        adapter = hunter.session.get_adapter("https://maps.googleapis.com")
+        assert adapter._pool_maxsize == 32
+        
+        # Уменьшение не пересоздаёт адаптер
+        hunter._ensure_pool_size(4)
+        assert hunter.session.get_adapter("https://maps.googleapis.com") is adapter
+    
     def test_generate_grid(self):
         """Тест генерации сетки точек."""
         hunter = StreetViewHunter(api_key="test_key")
@@ -38,6 +109,62 @@ class TestStreetViewHunter:
             assert 61.66 <= lat <= 61.67
             assert 50.83 <= lon <= 50.84
     
+    def test_generate_grid_is_product_of_axes(self):
+        """Тест: сетка — декартово произведение осей, по строкам широты."""
+        hunter = StreetViewHunter(api_key="test_key")
+        step_lat, step_lon = hunter._grid_steps(61.66, 61.67, 0.2)
+        lats = hunter._grid_axis(61.66, 61.67, step_lat)
+        lons = hunter._grid_axis(50.83, 50.84, step_lon)
+        
+        points = hunter._generate_grid(61.66, 61.67, 50.83, 50.84, 0.2)
+        
+        assert len(points) == len(lats) * len(lons)
+        assert points[:len(lons)] == [(lats[0], lon) for lon in lons]
+        assert points[-1] == (lats[-1], lons[-1])
+    
+    @pytest.mark.parametrize("start", [0, 1, 5, 7, 100])
+    def test_iter_grid_resumes_from_start(self, start):
+        """Тест: перебор сетки с точки start совпадает с хвостом списка."""
+        hunter = StreetViewHunter(api_key="test_key")
+        area = (61.66, 61.67, 50.83, 50.84, 0.2)
+        
+        assert list(hunter._iter_grid(*area, start=start)) == \
+            hunter._generate_grid(*area)[start:]
+    
+    def test_iter_grid_inverted_bounds_is_empty(self):
+        """Тест: при перепутанных границах долготы сетка пуста."""
+        hunter = StreetViewHunter(api_key="test_key")
+        area = (61.66, 61.67, 50.84, 50.83, 0.2)
+        
+        assert hunter._generate_grid(*area) == []
+        assert list(hunter._iter_grid(*area, start=3)) == []
+    
+    def test_generate_grid_inverted_range_shorter_than_step(self):
+        """Тест: перепутанные границы ближе шага не дают точек за пределами."""
+        hunter = StreetViewHunter(api_key="test_key")
+        
+        assert hunter._generate_grid(61.66, 61.67, 50.83, 50.8299, 0.2) == []
+    
+    def test_generate_grid_keeps_boundary(self):
+        """Тест: граничная точка не теряется из-за округления шага."""
+        hunter = StreetViewHunter(api_key="test_key")
+        
+        # Шаг ровно 0.01° по широте: (55.76 - 55.75) / 0.01 = 0.999... в float
+        points = hunter._generate_grid(55.75, 55.76, 37.60, 37.60, 1.11)
+        
+        assert [lat for lat, _ in points] == pytest.approx([55.75, 55.76])
+        assert max(lat for lat, _ in points) <= 55.76
+    
+    def test_densify_grid(self):
+        """Тест: мелкая сетка строится только в ячейке с найденной панорамой."""
+        hunter = StreetViewHunter(api_key="test_key")
+        
+        # Шаг 0.01° по широте, грубая сетка — 0.04°; панорама у (55.80, 37.60)
+        points = hunter._densify_grid(55.75, 55.87, 37.60, 37.60, 1.11, 4, [(55.80, 37.60)])
+        
+        # Ячейка с центром 55.79 — точки 55.77-55.80 кроме самой 55.79
+        assert [lat for lat, _ in points] == pytest.approx([55.77, 55.78, 55.80])
+    
     def test_calculate_distance(self):
         """Тест расчёта расстояния."""
         hunter = StreetViewHunter(api_key="test_key")
@@ -47,7 +174,7 @@ class TestStreetViewHunter:
             61.668742, 50.835369,
             61.668742, 50.835369
         )
-        assert abs(distance) < 0.1  # Практически 0
+        assert distance == 0.0
         
         # Разные точки
         distance = hunter._calculate_distance(
@@ -56,6 +183,13 @@ class TestStreetViewHunter:
         )
         assert distance > 0
     
+    def test_meters_per_degree_wgs84(self):
+        """Тест длины градуса на эллипсоиде WGS84."""
+        assert StreetViewHunter._meters_per_degree(0) == pytest.approx(
+            (110574, 111320), abs=1)
+        assert StreetViewHunter._meters_per_degree(60) == pytest.approx(
+            (111412, 55800), abs=1)
+    
     def test_create_panorama_link(self):
         """Тест создания ссылки на панораму."""
         hunter = StreetViewHunter(api_key="test_key")
@@ -73,12 +207,10 @@ class TestStreetViewHunter:
         assert test_pano_id in link
         assert "data=!3m6!1e1!3m4" in link
     
-    @patch('streetview_hunter.core.requests.Session')
-    def test_find_nearest_panorama_success(self, mock_session):
+    def test_find_nearest_panorama_success(self):
         """Тест успешного поиска панорамы."""
-        # Мокаем ответ API
-        mock_response = Mock()
-        mock_response.json.return_value = {
+        hunter = StreetViewHunter(api_key="test_key")
+        adapter = StubAdapter({
             "status": "OK",
             "pano_id": "test_pano_id_123",
             "location": {
@@ -87,14 +219,8 @@ class TestStreetViewHunter:
             },
             "date": "2023-07",
             "copyright": "© Google"
-        }
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get.return_value = mock_response
-        mock_session.return_value = mock_session_instance
-        
-        hunter = StreetViewHunter(api_key="test_key")
-        hunter.session = mock_session_instance
+        })
+        hunter.session.mount(METADATA_URL, adapter)
         
         result = hunter._find_nearest_panorama(
             lat=61.66, lon=50.83, radius=50
@@ -105,21 +231,15 @@ class TestStreetViewHunter:
         assert result["lat"] == 61.668742
         assert result["lng"] == 50.835369
         assert "link" in result
+        
+        # Запрос ушёл через настоящую сессию с нужными параметрами
+        query = parse_qs(urlparse(adapter.requests[0].url).query)
+        assert query == {"location": ["61.66,50.83"], "radius": ["50"], "key": ["test_key"]}
     
-    @patch('streetview_hunter.core.requests.Session')
-    def test_find_nearest_panorama_no_results(self, mock_session):
+    def test_find_nearest_panorama_no_results(self):
         """Тест поиска, когда панорамы не найдены."""
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            "status": "ZERO_RESULTS"
-        }
-        
-        mock_session_instance = Mock()
-        mock_session_instance.get.return_value = mock_response
-        mock_session.return_value = mock_session_instance
-        
         hunter = StreetViewHunter(api_key="test_key")
-        hunter.session = mock_session_instance
+        hunter.session.mount(METADATA_URL, StubAdapter({"status": "ZERO_RESULTS"}))
         
         result = hunter._find_nearest_panorama(
             lat=61.66, lon=50.83, radius=50
@@ -127,6 +247,228 @@ class TestStreetViewHunter:
         
         assert result is None
     
+    def test_search_area_concurrent(self, tmp_path):
+        """Тест параллельного поиска: каждая панорама попадает в результат один раз."""
+        def fake_get(url, params, timeout):
+            lat, lon = map(float, params["location"].split(","))
+            response = Mock()
+            response.content = json.dumps({
+                "status": "OK",
+                # Соседние точки сетки возвращают одну и ту же панораму
+                "pano_id": f"pano_{round(lat, 2)}",
+                "location": {"lat": lat, "lng": lon},
+                "date": "2023-07"
+            }).encode()
+            return response
+        
+        hunter = StreetViewHunter(api_key="test_key")
+        hunter.session = Mock()
+        hunter.session.get.side_effect = fake_get
+        
+        output_file = tmp_path / "test_search.txt"
+        stats = hunter.search_area(
+            lat_min=61.66, lat_max=61.69,
+            lon_min=50.81, lon_max=50.86,
+            step_km=0.5,
+            output_file=str(output_file),
+            delay=0,
+            concurrency=4
+        )
+        
+        points = hunter._generate_grid(61.66, 61.69, 50.81, 50.86, 0.5)
+        assert hunter.request_count == len(points)
+        assert hunter._meters_per_deg is None  # масштаб области не остаётся
+        assert stats["total"] == len(hunter.found_panos)
+        
+        with open(output_file, 'r') as f:
+            links = f.read().splitlines()
+        assert len(links) == len(set(links)) == stats["total"]
+    
+    def test_find_nearest_panorama_uses_cache(self, tmp_path):
+        """Тест: повторный запрос той же точки берётся из кэша."""
+        from streetview_hunter.cache import MetadataCache
+        
+        mock_response = Mock()
+        mock_response.content = json.dumps({
+            "status": "OK",
+            "pano_id": "test_pano_id_123",
+            "location": {"lat": 61.668742, "lng": 50.835369}
+        }).encode()
+        
+        with MetadataCache(str(tmp_path / "meta.db")) as cache:
+            hunter = StreetViewHunter(api_key="test_key", cache=cache)
+            hunter.session = Mock()
+            hunter.session.get.return_value = mock_response
+            
+            hunter._find_nearest_panorama(lat=61.66, lon=50.83, radius=50)
+            hunter.found_panos.clear()
+            result = hunter._find_nearest_panorama(lat=61.66, lon=50.83, radius=50)
+        
+        assert result["pano_id"] == "test_pano_id_123"
+        assert hunter.session.get.call_count == 1
+        assert hunter.request_count == 1
+        assert hunter.cache_hits == 1
+    
+    def test_skip_covered_points(self, tmp_path):
+        """Тест: точки рядом с уже найденной панорамой не запрашиваются."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps({
+            "status": "OK",
+            "pano_id": "test_pano_id",
+            "location": {"lat": 61.66, "lng": 50.83}
+        }).encode()
+        
+        hunter = StreetViewHunter(api_key="test_key")
+        hunter.session = Mock()
+        hunter.session.get.return_value = mock_response
+        
+        # Шаг 20 м при радиусе 50 м: соседние точки покрыты первой панорамой
+        hunter.search_area(
+            61.66, 61.6604, 50.83, 50.8304,
+            step_km=0.02, search_radius=50,
+            output_file=str(tmp_path / "out.txt"),
+            delay=0, concurrency=1, skip_covered=True
+        )
+        
+        assert hunter.session.get.call_count == 1
+        assert hunter.skipped_points == 5
+    
+    def test_over_query_limit_pauses_shared_limiter(self):
+        """Тест: отказ по лимиту приостанавливает общий ограничитель."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps({"status": "OVER_QUERY_LIMIT"}).encode()
+        
+        bucket = Mock()
+        hunter = StreetViewHunter(api_key="test_key", rate_limiter=bucket)
+        hunter.session = Mock()
+        hunter.session.get.return_value = mock_response
+        
+        assert hunter._find_nearest_panorama(61.66, 50.83, 50, bucket) is None
+        
+        # Точка запрашивается повторно, пауза растёт с каждым отказом подряд
+        assert hunter.session.get.call_count == hunter.RETRY_ATTEMPTS
+        assert [c.args[0] for c in bucket.pause.call_args_list] == [1.0, 2.0, 4.0]
+    
+    def test_concurrent_rate_limit_is_one_event(self, tmp_path, monkeypatch):
+        """Тест: одновременные отказы нескольких потоков — один случай перегрузки."""
+        from streetview_hunter import ratelimit
+        
+        concurrency = 4
+        barrier = threading.Barrier(concurrency, timeout=5)
+        all_paused = threading.Event()
+        lock = threading.Lock()
+        calls = []
+        pauses = []
+        
+        class FakeTime:
+            """Часы ограничителя: идут только во время его sleep."""
+            now = 1000.0
+            
+            @classmethod
+            def monotonic(cls):
+                return cls.now
+            
+            @classmethod
+            def sleep(cls, seconds):
+                # Пока не все потоки сообщили об отказе, пауза не истекает
+                assert all_paused.wait(timeout=5)
+                with lock:
+                    cls.now += seconds
+        
+        monkeypatch.setattr(ratelimit, "time", FakeTime)
+        
+        def get(*args, **kwargs):
+            with lock:
+                calls.append(1)
+                first_wave = len(calls) <= concurrency
+            response = Mock()
+            response.status_code = 200
+            if first_wave:
+                # Все запросы «в полёте» получают отказ одновременно
+                barrier.wait()
+                response.content = json.dumps({"status": "OVER_QUERY_LIMIT"}).encode()
+            else:
+                response.content = json.dumps({"status": "ZERO_RESULTS"}).encode()
+            return response
+        
+        bucket = ratelimit.AdaptiveTokenBucket(
+            rate=1000, capacity=concurrency, increase=1e-9
+        )
+        original_pause = bucket.pause
+        
+        def pause(seconds):
+            started = original_pause(seconds)
+            with lock:
+                pauses.append(started)
+                if len(pauses) == concurrency:
+                    all_paused.set()
+            return started
+        
+        bucket.pause = pause
+        hunter = StreetViewHunter(api_key="test_key", rate_limiter=bucket)
+        hunter.session = Mock()
+        hunter.session.get.side_effect = get
+        
+        hunter.search_area(
+            lat_min=61.66, lat_max=61.6604,
+            lon_min=50.83, lon_max=50.8304,
+            step_km=0.02, search_radius=50,
+            output_file=str(tmp_path / "out.txt"),
+            concurrency=concurrency
+        )
+        
+        assert pauses.count(True) == 1
+        assert bucket.rate == pytest.approx(500)
+    
+    def test_zero_results_resets_rate_limit_strikes(self):
+        """Тест: ответ ZERO_RESULTS сбрасывает счётчик отказов по лимиту."""
+        hunter = StreetViewHunter(api_key="test_key")
+        hunter.session.mount(METADATA_URL, StubAdapter({"status": "ZERO_RESULTS"}))
+        hunter._rate_limit_strikes = 3
+        
+        assert hunter._find_nearest_panorama(61.66, 50.83, 50) is None
+        assert hunter._rate_limit_strikes == 0
+    
+    def test_http_429_honors_retry_after(self):
+        """Тест: пауза после HTTP 429 не короче заголовка Retry-After."""
+        mock_response = Mock()
+        mock_response.status_code = 429
+        mock_response.headers = {"Retry-After": "5"}
+        
+        bucket = Mock()
+        hunter = StreetViewHunter(api_key="test_key", rate_limiter=bucket)
+        hunter.session = Mock()
+        hunter.session.get.return_value = mock_response
+        
+        assert hunter._find_nearest_panorama(61.66, 50.83, 50, bucket) is None
+        assert [c.args[0] for c in bucket.pause.call_args_list] == [5.0, 5.0, 5.0]
+    
+    def test_transient_errors_are_retried(self):
+        """Тест: обрыв соединения и HTTP 503 повторяются, затем ответ принимается."""
+        ok_response = Mock()
+        ok_response.status_code = 200
+        ok_response.content = json.dumps({
+            "status": "OK",
+            "pano_id": "test_pano_id",
+            "location": {"lat": 61.66, "lng": 50.83}
+        }).encode()
+        unavailable = Mock()
+        unavailable.status_code = 503
+        
+        hunter = StreetViewHunter(api_key="test_key")
+        hunter.RETRY_BACKOFF = 0
+        hunter.session = Mock()
+        hunter.session.get.side_effect = [
+            requests.exceptions.ConnectionError(), unavailable, ok_response
+        ]
+        
+        result = hunter._find_nearest_panorama(61.66, 50.83, 50)
+        
+        assert result["pano_id"] == "test_pano_id"
+        assert hunter.session.get.call_count == 3
+    
     def test_save_results_empty(self, tmp_path):
         """Тест сохранения пустых результатов."""
         hunter = StreetViewHunter(api_key="test_key")
@@ -171,5 +513,57 @@ class TestStreetViewHunter:
             assert "https://example.com/test1" in content
 
 
+class TestThrottledMemoryHandler:
+    """Тесты буфера сообщений журнала."""
+    
+    def test_buffers_until_capacity(self):
+        """Тест сброса буфера пачкой при заполнении."""
+        target = Mock()
+        handler = _ThrottledMemoryHandler(capacity=3, target=target, interval=60)
+        record = logging.LogRecord("svh", logging.INFO, __file__, 0, "msg", (), None)
+        
+        handler.handle(record)
+        handler.handle(record)
+        assert target.handle.call_count == 0
+        
+        handler.handle(record)
+        assert target.handle.call_count == 3
+    
+    def test_errors_flush_immediately(self):
+        """Тест немедленного сброса при ошибке."""
+        target = Mock()
+        handler = _ThrottledMemoryHandler(capacity=100, target=target, interval=60)
+        handler.handle(logging.LogRecord("svh", logging.INFO, __file__, 0, "a", (), None))
+        handler.handle(logging.LogRecord("svh", logging.ERROR, __file__, 0, "b", (), None))
+        
+        assert target.handle.call_count == 2
+    
+    def test_warning_flushes_without_next_record(self):
+        """Тест: предупреждение выводится сразу, не дожидаясь следующей записи."""
+        target = Mock()
+        handler = _ThrottledMemoryHandler(capacity=100, target=target, interval=60)
+        handler.handle(logging.LogRecord("svh", logging.INFO, __file__, 0, "a", (), None))
+        assert target.handle.call_count == 0
+        
+        handler.handle(logging.LogRecord("svh", logging.WARNING, __file__, 0, "b", (), None))
+        assert target.handle.call_count == 2
+    
+    def test_console_logging_is_opt_in(self):
+        """Тест: импорт не настраивает журнал, а вызов точки входа — один раз."""
+        assert logger.propagate
+        assert not any(isinstance(h, _ThrottledMemoryHandler) for h in logger.handlers)
+        
+        try:
+            enable_console_logging()
+            enable_console_logging()
+            added = [h for h in logger.handlers if isinstance(h, _ThrottledMemoryHandler)]
+            assert len(added) == 1
+        finally:
+            for handler in logger.handlers[:]:
+                if isinstance(handler, _ThrottledMemoryHandler):
+                    logger.removeHandler(handler)
+            logger.setLevel(logging.NOTSET)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,97 @@
+"""
+Тесты для модуля output.py
+"""
+
+import csv
+
+import pytest
+from streetview_hunter import output
+from streetview_hunter.output import ResultWriter, CSV_HEADER
+
+
+def make_panorama(pano_id, distance_m, date="2023-07"):
+    """Данные панорамы в формате результатов поиска."""
+    return {
+        "pano_id": pano_id,
+        "lat": 61.668742,
+        "lng": 50.835369,
+        "date": date,
+        "link": f"https://example.com/{pano_id}",
+        "searched_from": "61.66000,50.83000",
+        "distance_m": distance_m,
+        "found_at": "2024-01-01T12:00:00"
+    }
+
+
+class TestResultWriter:
+    """Тесты потоковой записи результатов."""
+    
+    def test_write_and_summary(self, tmp_path):
+        """Тест записи панорам и итоговой статистики."""
+        output_file = tmp_path / "results.txt"
+        
+        with ResultWriter(str(output_file)) as writer:
+            writer.write(make_panorama("a", 10.0))
+            writer.write(make_panorama("b", 20.0, date="2024-05"))
+        summary = writer.summary()
+        
+        assert output_file.read_text(encoding="utf-8").splitlines() == [
+            "https://example.com/a", "https://example.com/b"
+        ]
+        with open(summary["csv_file"], newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == CSV_HEADER
+        assert [row[0] for row in rows[1:]] == ["a", "b"]
+        
+        assert summary["total"] == 2
+        assert summary["stats"]["avg_distance"] == 15.0
+        assert summary["stats"]["unique_dates"] == 2
+    
+    def test_write_many_matches_write(self, tmp_path):
+        """Тест: пакетная запись даёт те же файлы, что и поштучная."""
+        panoramas = [make_panorama("a", 10.0), make_panorama("b", 20.0)]
+        
+        with ResultWriter(str(tmp_path / "one.txt")) as single:
+            for item in panoramas:
+                single.write(item)
+        with ResultWriter(str(tmp_path / "many.txt")) as batch:
+            batch.write_many(iter(panoramas))
+        
+        assert (tmp_path / "one.txt").read_bytes() == (tmp_path / "many.txt").read_bytes()
+        assert (tmp_path / "one_details.csv").read_bytes() == \
+            (tmp_path / "many_details.csv").read_bytes()
+        assert batch.summary()["stats"]["avg_distance"] == 15.0
+    
+    def test_write_many_consumes_iterator_in_batches(self, tmp_path, monkeypatch):
+        """Тест: генератор читается пачками, а не собирается целиком."""
+        monkeypatch.setattr(output, "WRITE_BATCH_SIZE", 2)
+        consumed = []
+        
+        def panoramas():
+            for i in range(5):
+                consumed.append(i)
+                yield make_panorama(str(i), 10.0)
+        
+        with ResultWriter(str(tmp_path / "results.txt")) as writer:
+            batches = []
+            original = writer._write_batch
+            monkeypatch.setattr(writer, "_write_batch",
+                                lambda items: (batches.append(len(consumed)), original(items)))
+            writer.write_many(panoramas())
+        
+        assert batches == [2, 4, 5]
+        assert writer.summary()["total"] == 5
+    
+    def test_no_files_without_results(self, tmp_path):
+        """Тест: без панорам файлы не создаются."""
+        output_file = tmp_path / "results.txt"
+        
+        with ResultWriter(str(output_file)) as writer:
+            pass
+        
+        assert not output_file.exists()
+        assert writer.summary()["total"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,107 @@
+"""
+Тесты для модуля ratelimit.py
+"""
+
+import time
+
+import pytest
+from streetview_hunter.ratelimit import TokenBucket, AdaptiveTokenBucket
+
+
+class TestTokenBucket:
+    """Тесты ограничителя частоты запросов."""
+    
+    def test_invalid_rate(self):
+        """Тест ошибки при неположительной скорости."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+    
+    def test_first_acquire_is_immediate(self):
+        """Тест: первый токен выдаётся без ожидания."""
+        bucket = TokenBucket(rate=1)
+        
+        start = time.monotonic()
+        bucket.acquire()
+        
+        assert time.monotonic() - start < 0.1
+    
+    def test_rate_is_limited(self):
+        """Тест: частота выдачи токенов не превышает rate."""
+        bucket = TokenBucket(rate=50)
+        
+        start = time.monotonic()
+        for _ in range(6):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+        
+        # Первый токен сразу, остальные 5 — с интервалом 1/50 сек
+        assert elapsed >= 5 / 50 * 0.9
+
+    
+    def test_burst_up_to_capacity(self):
+        """Тест: накопленный запас выдаётся залпом без ожидания."""
+        bucket = TokenBucket(rate=1, capacity=5)
+        
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        
+        assert time.monotonic() - start < 0.1
+    
+    def test_pause_delays_all_acquires(self):
+        """Тест: после pause токены не выдаются до её окончания."""
+        bucket = TokenBucket(rate=1000, capacity=10)
+        bucket.pause(0.1)
+        
+        start = time.monotonic()
+        bucket.acquire()
+        
+        assert time.monotonic() - start >= 0.09
+
+
+
+class TestAdaptiveTokenBucket:
+    """Тесты адаптивного (AIMD) ограничителя."""
+    
+    def test_pause_halves_rate(self):
+        """Тест: отказ по лимиту вдвое снижает частоту, но не ниже min_rate."""
+        bucket = AdaptiveTokenBucket(rate=40, min_rate=15)
+        
+        bucket.pause(0)
+        assert bucket.rate == 20
+        
+        bucket.pause(0)
+        assert bucket.rate == 15
+    
+    def test_pause_during_pause_is_one_event(self):
+        """Тест: отказы во время идущей паузы не снижают частоту повторно."""
+        bucket = AdaptiveTokenBucket(rate=40)
+        
+        assert bucket.pause(10) is True
+        assert bucket.pause(10) is False
+        assert bucket.pause(10) is False
+        assert bucket.rate == 20
+    
+    def test_success_restores_rate(self):
+        """Тест: быстрые ответы восстанавливают частоту до максимума."""
+        bucket = AdaptiveTokenBucket(rate=40, increase=5, latency_target=0.5)
+        bucket.pause(0)
+        
+        bucket.record_success(0.1)
+        assert bucket.rate == 25
+        
+        for _ in range(10):
+            bucket.record_success(0.1)
+        assert bucket.rate == 40
+    
+    def test_slow_responses_do_not_raise_rate(self):
+        """Тест: при высокой задержке частота не растёт."""
+        bucket = AdaptiveTokenBucket(rate=40, increase=5, latency_target=0.5)
+        bucket.pause(0)
+        
+        bucket.record_success(2.0)
+        assert bucket.rate == 20
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
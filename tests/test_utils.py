@@ -3,11 +3,12 @@
 """
 
 import pytest
-import tempfile
 import yaml
 from streetview_hunter.utils import (
     load_config,
     save_config,
+    list_config_files,
+    is_valid_key,
     validate_coordinates,
     calculate_area_size,
     estimate_points_count
@@ -25,6 +26,13 @@ class TestUtils:
             lon_min=50.81, lon_max=50.86
         ) is True
     
+    def test_is_valid_key(self):
+        """Тест проверки формата API ключа."""
+        assert is_valid_key("AIza" + "x" * 35) is True
+        assert is_valid_key("") is False
+        assert is_valid_key("ВАШ_GOOGLE_API_КЛЮЧ") is False
+        assert is_valid_key("AIza short") is False
+    
     def test_validate_coordinates_invalid_range(self):
         """Тест валидации координат вне диапазона."""
         with pytest.raises(ValueError):
@@ -73,7 +81,7 @@ class TestUtils:
         assert points_count > 0
         assert isinstance(points_count, int)
     
-    def test_load_and_save_config(self):
+    def test_load_and_save_config(self, tmp_path):
         """Тест загрузки и сохранения конфигурации."""
         test_config = {
             "name": "Тестовый город",
@@ -93,60 +101,151 @@ class TestUtils:
         }
         
         # Сохраняем во временный файл
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            temp_file = f.name
-            yaml.dump(test_config, f, default_flow_style=False)
-        
-        try:
-            # Загружаем обратно
-            loaded_config = load_config(temp_file)
-            
-            # Проверяем, что конфигурация загрузилась корректно
-            assert loaded_config["name"] == test_config["name"]
-            assert loaded_config["bounds"]["lat_min"] == test_config["bounds"]["lat_min"]
-            assert loaded_config["search_params"]["step_km"] == test_config["search_params"]["step_km"]
-            
-        finally:
-            # Удаляем временный файл
-            import os
-            os.unlink(temp_file)
+        temp_file = tmp_path / "config.yaml"
+        temp_file.write_text(
+            yaml.dump(test_config, default_flow_style=False), encoding="utf-8"
+        )
+        
+        # Загружаем обратно
+        loaded_config = load_config(str(temp_file))
+        
+        # Проверяем, что конфигурация загрузилась корректно
+        assert loaded_config["name"] == test_config["name"]
+        assert loaded_config["bounds"]["lat_min"] == test_config["bounds"]["lat_min"]
+        assert loaded_config["search_params"]["step_km"] == test_config["search_params"]["step_km"]
+    
+    def test_save_config_roundtrip(self, tmp_path):
+        """Тест: save_config пишет YAML, который load_config читает обратно."""
+        test_config = {
+            "name": "Сыктывкар",
+            "bounds": {"lat_min": 61.66, "lat_max": 61.69,
+                       "lon_min": 50.81, "lon_max": 50.86},
+            "search_params": {"step_km": 0.12},
+            "output": {"filename": "сыктывкар_панорамы.txt"}
+        }
+        config_path = tmp_path / "city.yaml"
+        
+        save_config(test_config, str(config_path))
+        
+        assert "Сыктывкар" in config_path.read_text(encoding="utf-8")
+        assert load_config(str(config_path)) == test_config
+    
+    def test_load_config_cached(self, tmp_path):
+        """Тест: повторная загрузка берёт копию из кэша, изменения файла видны."""
+        config_path = tmp_path / "city.yaml"
+        config = {"bounds": {}, "search_params": {}, "output": {"filename": "a.txt"}}
+        save_config(config, str(config_path))
+        
+        first = load_config(str(config_path))
+        first["output"]["filename"] = "изменено.txt"
+        
+        # Изменение возвращённого словаря не портит кэш
+        assert load_config(str(config_path))["output"]["filename"] == "a.txt"
+        
+        config["output"]["filename"] = "другой_файл.txt"
+        save_config(config, str(config_path))
+        
+        assert load_config(str(config_path))["output"]["filename"] == "другой_файл.txt"
+    
+    def test_load_config_cache_is_bounded(self, tmp_path, monkeypatch):
+        """Тест: кэш конфигураций вытесняет самые давние записи."""
+        from streetview_hunter import utils
+        
+        monkeypatch.setattr(utils, "_CONFIG_CACHE", utils.OrderedDict())
+        monkeypatch.setattr(utils, "_CONFIG_CACHE_MAXSIZE", 2)
+        
+        for i in range(3):
+            config_path = tmp_path / f"city{i}.yaml"
+            save_config({"bounds": {}, "search_params": {}, "output": {"filename": f"{i}.txt"}},
+                        str(config_path))
+            load_config(str(config_path))
+        
+        assert len(utils._CONFIG_CACHE) == 2
+    
+    def test_list_config_files(self, tmp_path):
+        """Тест поиска YAML-конфигураций в папке."""
+        (tmp_path / "b.yml").write_text("")
+        (tmp_path / "a.yaml").write_text("")
+        (tmp_path / "notes.txt").write_text("")
+        (tmp_path / "nested.yaml").mkdir()
+        
+        assert list_config_files(str(tmp_path)) == [
+            str(tmp_path / "a.yaml"),
+            str(tmp_path / "b.yml")
+        ]
     
     def test_load_config_missing_file(self):
         """Тест загрузки несуществующего файла конфигурации."""
         with pytest.raises(FileNotFoundError):
             load_config("non_existent_file.yaml")
     
-    def test_load_config_invalid_yaml(self):
+    def test_load_config_invalid_yaml(self, tmp_path):
         """Тест загрузки некорректного YAML файла."""
         # Создаём файл с некорректным YAML
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            temp_file = f.name
-            f.write("invalid: yaml: content: [")
-        
-        try:
-            with pytest.raises(yaml.YAMLError):
-                load_config(temp_file)
-        finally:
-            import os
-            os.unlink(temp_file)
-    
-    def test_load_config_missing_keys(self):
+        temp_file = tmp_path / "invalid.yaml"
+        temp_file.write_text("invalid: yaml: content: [", encoding="utf-8")
+        
+        with pytest.raises(yaml.YAMLError):
+            load_config(str(temp_file))
+    
+    def test_load_config_missing_keys(self, tmp_path):
         """Тест загрузки конфигурации с отсутствующими ключами."""
         incomplete_config = {
             "name": "Неполная конфигурация"
             # Нет обязательных ключей bounds, search_params, output
         }
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            temp_file = f.name
-            yaml.dump(incomplete_config, f, default_flow_style=False)
+        temp_file = tmp_path / "incomplete.yaml"
+        temp_file.write_text(
+            yaml.dump(incomplete_config, default_flow_style=False), encoding="utf-8"
+        )
         
-        try:
-            with pytest.raises(ValueError):
-                load_config(temp_file)
-        finally:
-            import os
-            os.unlink(temp_file)
+        with pytest.raises(ValueError):
+            load_config(str(temp_file))
+
+
+def test_json_loads():
+    """Тест разбора JSON из bytes и str."""
+    from streetview_hunter.utils import json_loads
+    
+    assert json_loads(b'{"status": "OK"}') == {"status": "OK"}
+    assert json_loads('{"name": "Сыктывкар"}') == {"name": "Сыктывкар"}
+
+
+def test_json_dumps():
+    """Тест сериализации JSON в UTF-8 без экранирования кириллицы."""
+    from streetview_hunter.utils import json_dumps, json_loads
+    
+    data = {"name": "Сыктывкар", "bounds": {"lat_min": 61.66}}
+    payload = json_dumps(data)
+    
+    assert isinstance(payload, bytes)
+    assert "Сыктывкар".encode("utf-8") in payload
+    assert json_loads(payload) == data
+
+
+def test_json_dumps_compact():
+    """Тест компактной сериализации JSON (без отступов и переводов строк)."""
+    from streetview_hunter.utils import json_dumps, json_loads
+    
+    data = {"status": "OK", "location": {"lat": 61.66, "lng": 50.83}}
+    payload = json_dumps(data, indent=False)
+    
+    assert b"\n" not in payload
+    assert json_loads(payload) == data
+
+
+def test_save_and_load_results_json(tmp_path):
+    """Тест сохранения и загрузки результатов в JSON."""
+    from streetview_hunter.utils import save_results_json, load_results_json
+    
+    results = [{"pano_id": "test_id", "date": "2023-07", "city": "Сыктывкар"}]
+    output_path = tmp_path / "results.json"
+    
+    save_results_json(results, str(output_path))
+    
+    assert "Сыктывкар" in output_path.read_text(encoding="utf-8")
+    assert load_results_json(str(output_path)) == results
 
 
 def test_format_link():